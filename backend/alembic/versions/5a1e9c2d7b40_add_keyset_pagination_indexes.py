@@ -0,0 +1,38 @@
+"""Add composite (sort column, id) indexes for keyset pagination
+
+Revision ID: 5a1e9c2d7b40
+Revises: 4c3d74cg64f
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a1e9c2d7b40'
+down_revision: Union[str, None] = '4c3d74cg64f'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+KEYSET_INDEXES = {
+    'students': ['last_name', 'created_at'],
+    'teachers': ['last_name', 'specialization', 'created_at'],
+    'instruments': ['name', 'type', 'created_at'],
+    'schedule': ['start_time', 'room', 'created_at'],
+}
+
+
+def upgrade() -> None:
+    for table, columns in KEYSET_INDEXES.items():
+        for column in columns:
+            op.create_index(f'ix_{table}_{column}_id', table, [column, 'id'])
+
+
+def downgrade() -> None:
+    for table, columns in KEYSET_INDEXES.items():
+        for column in columns:
+            op.drop_index(f'ix_{table}_{column}_id', table_name=table)
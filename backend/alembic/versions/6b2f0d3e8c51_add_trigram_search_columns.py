@@ -0,0 +1,54 @@
+"""Add generated search columns with pg_trgm GIN indexes
+
+Revision ID: 6b2f0d3e8c51
+Revises: 5a1e9c2d7b40
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6b2f0d3e8c51'
+down_revision: Union[str, None] = '5a1e9c2d7b40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+GENERATED_COLUMNS = {
+    'students': {
+        'full_name': "first_name || ' ' || last_name",
+        'search_text': "first_name || ' ' || last_name || ' ' || email || ' ' || phone",
+    },
+    'teachers': {
+        'full_name': "first_name || ' ' || last_name",
+        'search_text': "first_name || ' ' || last_name || ' ' || email || ' ' || phone || ' ' || specialization",
+    },
+    'instruments': {
+        'search_text': "name || ' ' || type || ' ' || brand || ' ' || condition",
+    },
+    'schedule': {
+        'search_text': "day_of_week || ' ' || room",
+    },
+}
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table, columns in GENERATED_COLUMNS.items():
+        for name, expression in columns.items():
+            op.add_column(table, sa.Column(name, sa.Text(), sa.Computed(expression, persisted=True), nullable=False))
+            op.create_index(
+                f'ix_{table}_{name}_trgm', table, [name],
+                postgresql_using='gin', postgresql_ops={name: 'gin_trgm_ops'}
+            )
+
+
+def downgrade() -> None:
+    for table, columns in GENERATED_COLUMNS.items():
+        for name in columns:
+            op.drop_index(f'ix_{table}_{name}_trgm', table_name=table)
+            op.drop_column(table, name)
@@ -0,0 +1,48 @@
+"""Add schedule slot range with teacher, student and room exclusion constraints
+
+Revision ID: 7c3a1e4f9d62
+Revises: 6b2f0d3e8c51
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c3a1e4f9d62'
+down_revision: Union[str, None] = '6b2f0d3e8c51'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+OVERLAP_RESOURCES = ['teacher_id', 'student_id', 'room']
+
+
+def upgrade() -> None:
+    # Existing overlapping rows have to be resolved before this migration can apply.
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    op.create_check_constraint('ck_schedule_time_order', 'schedule', 'end_time > start_time')
+    op.add_column('schedule', sa.Column(
+        'slot', postgresql.TSRANGE(),
+        sa.Computed("tsrange(DATE '2000-01-01' + start_time, DATE '2000-01-01' + end_time)", persisted=True),
+        nullable=True
+    ))
+    for resource in OVERLAP_RESOURCES:
+        name = resource.removesuffix('_id')
+        op.create_exclude_constraint(
+            f'ex_schedule_{name}_overlap', 'schedule',
+            (resource, '='), ('day_of_week', '='), ('slot', '&&'),
+            using='gist'
+        )
+
+
+def downgrade() -> None:
+    for resource in OVERLAP_RESOURCES:
+        name = resource.removesuffix('_id')
+        op.drop_constraint(f'ex_schedule_{name}_overlap', 'schedule')
+    op.drop_column('schedule', 'slot')
+    op.drop_constraint('ck_schedule_time_order', 'schedule', type_='check')
@@ -0,0 +1,36 @@
+"""Cascade schedule rows on student and teacher delete in the database
+
+Revision ID: 8d4e2b6f1a73
+Revises: 7c3a1e4f9d62
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4e2b6f1a73'
+down_revision: Union[str, None] = '7c3a1e4f9d62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+FOREIGN_KEYS = [('student_id', 'students'), ('teacher_id', 'teachers')]
+
+
+def _recreate_foreign_keys(ondelete: Union[str, None]) -> None:
+    # The cascading lookups by student_id / teacher_id are served by the exclusion constraints' gist indexes.
+    for column, referent in FOREIGN_KEYS:
+        name = f'schedule_{column}_fkey'
+        op.drop_constraint(name, 'schedule', type_='foreignkey')
+        op.create_foreign_key(name, 'schedule', referent, [column], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    _recreate_foreign_keys('CASCADE')
+
+
+def downgrade() -> None:
+    _recreate_foreign_keys(None)
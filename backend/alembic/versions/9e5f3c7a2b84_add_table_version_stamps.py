@@ -0,0 +1,43 @@
+"""Add per-table version stamps bumped by statement-level triggers
+
+Revision ID: 9e5f3c7a2b84
+Revises: 8d4e2b6f1a73
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from backend.app.data.versions import SEED_VERSIONS, VERSION_FUNCTION, VERSIONED_TABLES, version_trigger
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e5f3c7a2b84'
+down_revision: Union[str, None] = '8d4e2b6f1a73'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'table_versions',
+        sa.Column('table_name', sa.String(length=63), nullable=False),
+        sa.Column('slot', sa.SmallInteger(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.Column('changed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.PrimaryKeyConstraint('table_name', 'slot')
+    )
+    op.execute(VERSION_FUNCTION)
+    op.execute(SEED_VERSIONS)
+    for table in VERSIONED_TABLES:
+        for statement in version_trigger(table):
+            op.execute(statement)
+
+
+def downgrade() -> None:
+    for table in VERSIONED_TABLES:
+        op.execute(f"DROP TRIGGER IF EXISTS {table}_bump_version ON {table}")
+    op.execute("DROP FUNCTION IF EXISTS bump_table_version()")
+    op.drop_table('table_versions')
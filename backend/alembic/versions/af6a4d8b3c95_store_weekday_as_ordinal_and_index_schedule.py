@@ -0,0 +1,82 @@
+"""Store schedule weekday as a smallint ordinal and index per-participant lookups
+
+Revision ID: af6a4d8b3c95
+Revises: 9e5f3c7a2b84
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'af6a4d8b3c95'
+down_revision: Union[str, None] = '9e5f3c7a2b84'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+WEEKDAYS = "ARRAY['Понедельник', 'Вторник', 'Среда', 'Четверг', 'Пятница', 'Суббота', 'Воскресенье']::text[]"
+LOOKUP_INDEXES = {
+    'ix_schedule_teacher_day_start': ['teacher_id', 'day_of_week', 'start_time'],
+    'ix_schedule_student_day_start': ['student_id', 'day_of_week', 'start_time'],
+    'ix_schedule_room_day_start': ['room', 'day_of_week', 'start_time'],
+}
+
+
+def _replace_search_text(expression: str, alter) -> None:
+    # A generated column blocks type changes of the columns it reads, so it is rebuilt around them.
+    op.drop_index('ix_schedule_search_text_trgm', table_name='schedule')
+    op.drop_column('schedule', 'search_text')
+    alter()
+    op.add_column('schedule', sa.Column(
+        'search_text', sa.Text(), sa.Computed(expression, persisted=True), nullable=False
+    ))
+    op.create_index(
+        'ix_schedule_search_text_trgm', 'schedule', ['search_text'],
+        postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'}
+    )
+
+
+def upgrade() -> None:
+    # Refuse to guess: names that are not a weekday have to be fixed by hand first.
+    op.execute(f"""
+        DO $$
+        DECLARE unknown text;
+        BEGIN
+            SELECT string_agg(DISTINCT day_of_week, ', ') INTO unknown FROM schedule
+            WHERE array_position({WEEKDAYS}, initcap(btrim(day_of_week))) IS NULL;
+            IF unknown IS NOT NULL THEN
+                RAISE EXCEPTION 'schedule.day_of_week has values that are not weekdays: %', unknown;
+            END IF;
+        END
+        $$
+    """)
+
+    def alter():
+        # The exclusion constraints on day_of_week are rebuilt by the type change itself.
+        op.alter_column(
+            'schedule', 'day_of_week', type_=sa.SmallInteger(), existing_nullable=False,
+            postgresql_using=f"array_position({WEEKDAYS}, initcap(btrim(day_of_week)))::smallint"
+        )
+
+    _replace_search_text(f"({WEEKDAYS})[day_of_week] || ' ' || room", alter)
+    op.create_check_constraint('ck_schedule_day_of_week', 'schedule', 'day_of_week BETWEEN 1 AND 7')
+    for name, columns in LOOKUP_INDEXES.items():
+        op.create_index(name, 'schedule', columns)
+
+
+def downgrade() -> None:
+    for name in LOOKUP_INDEXES:
+        op.drop_index(name, table_name='schedule')
+    op.drop_constraint('ck_schedule_day_of_week', 'schedule', type_='check')
+
+    def alter():
+        op.alter_column(
+            'schedule', 'day_of_week', type_=sa.String(length=20), existing_nullable=False,
+            postgresql_using=f"({WEEKDAYS})[day_of_week]"
+        )
+
+    _replace_search_text("day_of_week || ' ' || room", alter)
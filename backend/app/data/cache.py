@@ -0,0 +1,44 @@
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Bounded LRU mapping whose entries expire after ``ttl`` seconds or an explicit deadline."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, expires_at: float | None = None) -> None:
+        """Store ``value``; ``expires_at`` is a wall-clock timestamp that can shorten the TTL."""
+        if self.maxsize <= 0:
+            return
+        deadline = time.monotonic() + self.ttl
+        if expires_at is not None:
+            deadline = min(deadline, time.monotonic() + (expires_at - time.time()))
+        self._data[key] = (value, deadline)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        entry = self._data.pop(key, None)
+        return default if entry is None else entry[0]
+
+    def clear(self) -> None:
+        self._data.clear()
@@ -1,18 +1,237 @@
+import hashlib
+import time
 from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from uuid import uuid4
+from fastapi import Request
+from sqlalchemy import event, exc, make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.util import await_
 from backend.app.config import settings
+from backend.app.data.cache import TTLCache
+from backend.app.data.replicas import CONNECT_ERRORS, ReplicaSet
 
-engine = create_async_engine(settings.DATABASE_URL, echo=False, future=True)
+pool_waits = {"checkouts": 0, "wait_seconds": 0.0, "max_wait_seconds": 0.0, "timeouts": 0}
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long callers wait for a connection."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            pool_waits["timeouts"] += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            pool_waits["checkouts"] += 1
+            pool_waits["wait_seconds"] += waited
+            pool_waits["max_wait_seconds"] = max(pool_waits["max_wait_seconds"], waited)
+
+
+def _prepared_statement_name() -> str:
+    return f"__asyncpg_{uuid4()}__"
+
+
+def create_engine_from_settings(url: str, poolclass=InstrumentedPool, connect_timeout: float | None = None):
+    statement_cache_size = 0 if settings.DB_PGBOUNCER else settings.DB_STATEMENT_CACHE_SIZE
+    # asyncpg caches statements per connection; SQLAlchemy keeps its own cache on top of it.
+    connect_args = {"statement_cache_size": statement_cache_size}
+    if settings.DB_PGBOUNCER:
+        # Unique names keep statements prepared on one server connection from clashing on another.
+        connect_args["prepared_statement_name_func"] = _prepared_statement_name
+    if connect_timeout is not None:
+        connect_args["timeout"] = connect_timeout
+    return create_async_engine(
+        make_url(url).update_query_dict({"prepared_statement_cache_size": str(statement_cache_size)}),
+        echo=False, future=True, poolclass=poolclass,
+        pool_size=settings.DB_POOL_SIZE, max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT, pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING, connect_args=connect_args,
+    )
+
+
+engine = create_engine_from_settings(settings.DATABASE_URL)
 AsyncSessionMaker = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+# Replica pools are left out of ``pool_waits``, which describes the primary.
+replicas = ReplicaSet([
+    create_engine_from_settings(url, poolclass=AsyncAdaptedQueuePool, connect_timeout=settings.REPLICA_CHECK_TIMEOUT)
+    for url in settings.DATABASE_READ_URLS
+])
+# Clients that wrote within READ_YOUR_WRITES_WINDOW, keyed by a digest of their token or address.
+_recent_writers = TTLCache(settings.READ_YOUR_WRITES_CACHE_SIZE, settings.READ_YOUR_WRITES_WINDOW)
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# Set for the duration of an HTTP request by ``request_session``; ``get_session`` joins it.
+_request_session: ContextVar[AsyncSession | None] = ContextVar("request_session", default=None)
+# Per-request counters filled by the engine events below; installed by the HTTP middleware.
+db_stats: ContextVar[dict | None] = ContextVar("db_stats", default=None)
+# Postgres statement_timeout in ms for the current request's route group; set by the admission middleware.
+statement_timeout_ms: ContextVar[int | None] = ContextVar("statement_timeout_ms", default=None)
+# Where this request's reads go: PRIMARY, the replica picked by its first read, or None while undecided.
+PRIMARY = "primary"
+_read_target: ContextVar[object] = ContextVar("read_target", default=None)
 
 
 class Base(DeclarativeBase):
     pass
 
 
+def _count(key: str) -> None:
+    stats = db_stats.get()
+    if stats is not None:
+        stats[key] += 1
+
+
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    _count("connections")
+
+
+def _on_connect(dbapi_connection, connection_record):
+    connection_record.info.pop("statement_timeout_ms", None)
+
+
+def _apply_statement_timeout(dbapi_connection, connection_record, connection_proxy):
+    # Behind transaction-pooling PgBouncer a session SET would leak to other clients.
+    timeout = statement_timeout_ms.get()
+    if settings.DB_PGBOUNCER or connection_record.info.get("statement_timeout_ms") == timeout:
+        return
+    sql = "RESET statement_timeout" if timeout is None else f"SET statement_timeout = {int(timeout)}"
+    started = time.perf_counter()
+    await_(dbapi_connection.driver_connection.execute(sql))
+    connection_record.info["statement_timeout_ms"] = timeout
+    # Not a cursor execute, so it is added to the request's statements here.
+    stats = db_stats.get()
+    if stats is not None:
+        stats["queries"].append(time.perf_counter() - started)
+
+
+def _on_begin(conn):
+    _count("transactions")
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany):
+    context.started_at = time.perf_counter()
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = db_stats.get()
+    if stats is not None:
+        elapsed = time.perf_counter() - context.started_at
+        stats["queries"].append(elapsed)
+        statements = stats.get("statements")
+        if statements is not None:
+            # Only a digest of the parameters is kept, never the values themselves.
+            fingerprint = hashlib.blake2b(repr(parameters).encode(), digest_size=6).hexdigest()
+            statements.append((statement, elapsed, fingerprint))
+
+
+def _instrument(target) -> None:
+    """Request counters and statement timeouts for the primary and every replica alike."""
+    sync_engine = target.sync_engine
+    event.listen(sync_engine.pool, "checkout", _on_checkout)
+    event.listen(sync_engine.pool, "connect", _on_connect)
+    event.listen(sync_engine.pool, "checkout", _apply_statement_timeout)
+    event.listen(sync_engine, "begin", _on_begin)
+    event.listen(sync_engine, "before_cursor_execute", _before_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_execute)
+
+
+for _target in (engine, *(replica.engine for replica in replicas)):
+    _instrument(_target)
+
+
+def pool_status() -> dict:
+    pool = engine.sync_engine.pool
+    checkouts = pool_waits["checkouts"]
+    return {
+        "size": pool.size(), "checked_out": pool.checkedout(), "idle": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0), "max_overflow": settings.DB_MAX_OVERFLOW,
+        "checkouts": checkouts, "timeouts": pool_waits["timeouts"],
+        "avg_wait_ms": round(pool_waits["wait_seconds"] / checkouts * 1000, 3) if checkouts else 0.0,
+        "max_wait_ms": round(pool_waits["max_wait_seconds"] * 1000, 3),
+        "pgbouncer": settings.DB_PGBOUNCER, "replicas": replicas.status(),
+    }
+
+
+def new_db_stats() -> dict:
+    # "queries" holds each statement's duration in seconds; "statements" adds the SQL when profiling.
+    stats = {"connections": 0, "transactions": 0, "queries": []}
+    if settings.SQL_PROFILE_ENABLED:
+        stats["statements"] = []
+    return stats
+
+
+def _client_key(request: Request) -> str:
+    client = request.headers.get("authorization") or (request.client.host if request.client else "")
+    return hashlib.blake2b(client.encode(), digest_size=12).hexdigest()
+
+
+async def request_session(request: Request):
+    """FastAPI dependency: one session, one connection checkout and one commit per request."""
+    writes = request.method not in SAFE_METHODS
+    client = _client_key(request) if replicas else None
+    sticky = client is not None and _recent_writers.get(client) is not None
+    _read_target.set(PRIMARY if writes or sticky or not replicas else None)
+    async with AsyncSessionMaker() as session:
+        session.info["after_commit"] = []
+        session.info["writes"] = writes
+        _request_session.set(session)
+        try:
+            yield session
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            _request_session.set(None)
+            replica_session = session.info.pop("replica_session", None)
+            if replica_session is not None:
+                await replica_session.close()
+        if writes and client is not None:
+            _recent_writers.set(client, True)
+        for callback in session.info["after_commit"]:
+            callback()
+
+
+def in_write_request() -> bool:
+    session = _request_session.get()
+    return session is not None and session.info["writes"]
+
+
+def current_request_session() -> AsyncSession | None:
+    return _request_session.get()
+
+
+def detach_request_session() -> None:
+    """Make ``get_session`` open its own session in this context."""
+    _request_session.set(None)
+
+
+def after_commit(callback) -> None:
+    """Run ``callback`` once the surrounding request transaction commits (immediately outside one)."""
+    session = _request_session.get()
+    if session is None:
+        callback()
+    else:
+        session.info["after_commit"].append(callback)
+
+
 @asynccontextmanager
-async def get_session():
+async def get_session(nested: bool = False):
+    session = _request_session.get()
+    if session is not None:
+        if nested:
+            # Lets callers recover from a failed statement without losing the request transaction.
+            async with session.begin_nested():
+                yield session
+        else:
+            yield session
+        return
     async with AsyncSessionMaker() as session:
         try:
             yield session
@@ -20,3 +239,59 @@ async def get_session():
         except Exception:
             await session.rollback()
             raise
+
+
+def read_target():
+    return _read_target.get()
+
+
+async def _choose_target(pin: bool):
+    target = _read_target.get()
+    if target is None:
+        target = await replicas.choose() or PRIMARY
+        if pin:
+            _read_target.set(target)
+    return target
+
+
+async def _replica_session(replica) -> AsyncSession | None:
+    session = replica.sessionmaker()
+    try:
+        await session.connection()
+    except CONNECT_ERRORS:
+        await session.close()
+        replicas.mark_down(replica)
+        return None
+    return session
+
+
+@asynccontextmanager
+async def get_read_session():
+    """Read-only session on a usable replica, else ``get_session()``; a request's first read picks the server."""
+    owner = _request_session.get()
+    session = owner.info.get("replica_session") if owner is not None else None
+    if session is None:
+        target = await _choose_target(pin=owner is not None)
+        session = await _replica_session(target) if target is not PRIMARY else None
+        if session is None and target is not PRIMARY and owner is not None:
+            # The pinned replica went down: the primary is never behind what it served.
+            _read_target.set(PRIMARY)
+        if session is not None and owner is not None:
+            owner.info["replica_session"] = session
+    if session is None:
+        async with get_session() as session:
+            yield session
+        return
+    if owner is not None:
+        yield session
+        return
+    try:
+        yield session
+    finally:
+        await session.close()
+
+
+async def get_read_engine():
+    """Engine for long read-only streams such as exports, chosen like ``get_read_session``."""
+    target = await _choose_target(pin=_request_session.get() is not None)
+    return engine if target is PRIMARY else target.engine
@@ -1,5 +1,206 @@
+import json
+from contextlib import asynccontextmanager
+from datetime import date, datetime, time
+from sqlalchemy import BigInteger, Integer, and_, any_, cast, column, delete, func, literal, or_, select, table, tuple_, update
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+from backend.app.data.db import engine, get_read_engine, get_session
 from backend.app.data.models import Models
+from backend.app.data.pagination import Page, TotalMode, decode_cursor, encode_cursor
+
+UNIQUE_VIOLATION = "23505"
+
+
+class DuplicateError(Exception):
+    def __init__(self, field: str):
+        super().__init__(f"{field} already exists")
+        self.field = field
 
 
 class BaseRequests(Models):
-    pass
+    # Columns that list, detail and export reads select into plain rows instead of entities.
+    READ_COLUMNS: tuple[str, ...] = ()
+    IMPORT_COLUMNS: tuple[str, ...] = ()
+    UNIQUE_COLUMN: str | None = None
+
+    def _read_query(self, model):
+        return select(*(getattr(model, c) for c in self.READ_COLUMNS))
+
+    @staticmethod
+    def _search_match(search: str, *columns):
+        # Both ILIKE and the word-similarity operator are served by the gin_trgm_ops indexes.
+        return or_(*(or_(c.ilike(f"%{search}%"), literal(search).op("<%")(c)) for c in columns))
+
+    @staticmethod
+    def _search_rank(search: str, *columns):
+        ranks = [func.word_similarity(search, c) for c in columns]
+        return ranks[0] if len(ranks) == 1 else func.greatest(*ranks)
+
+    @staticmethod
+    def _id_in(model, ids):
+        # One array parameter keeps the statement, and its cached plan, the same for any batch size.
+        return model.id == any_(literal(list(ids), ARRAY(Integer)))
+
+    @staticmethod
+    def _coerce_sort_value(sort_column, value):
+        python_type = sort_column.type.python_type
+        try:
+            if python_type in (date, datetime, time):
+                return python_type.fromisoformat(value)
+            return python_type(value)
+        except TypeError as e:
+            raise ValueError("Invalid cursor") from e
+
+    def _paginate(self, query, model, sort: str, page: int, per_page: int, cursor: str | None, rank=None):
+        sort_column = rank if sort == "relevance" else getattr(model, sort)
+        if cursor:
+            cursor_sort, value, last_id = decode_cursor(cursor)
+            if cursor_sort != sort:
+                raise ValueError("Cursor does not match sort")
+            if sort == "id":
+                query = query.where(model.id > last_id)
+            elif sort == "relevance":
+                value = float(value)
+                query = query.where(or_(sort_column < value, and_(sort_column == value, model.id > last_id)))
+            else:
+                value = self._coerce_sort_value(sort_column, value)
+                query = query.where(tuple_(sort_column, model.id) > tuple_(value, last_id))
+        else:
+            query = query.offset((page - 1) * per_page)
+        if sort == "id":
+            order_by = (model.id,)
+        else:
+            order_by = (sort_column.desc() if sort == "relevance" else sort_column, model.id)
+        # One extra row tells whether another page exists without counting.
+        return query.order_by(*order_by).limit(per_page + 1)
+
+    @staticmethod
+    def _count_query(query, model):
+        return select(func.count()).select_from(query.with_only_columns(model.id).order_by(None).subquery())
+
+    @staticmethod
+    def _reltuples(model):
+        pg_class = table("pg_class", column("oid"), column("reltuples"))
+        return (
+            select(cast(func.greatest(pg_class.c.reltuples, 0), BigInteger))
+            .where(pg_class.c.oid == func.to_regclass(model.__tablename__))
+            .scalar_subquery()
+        )
+
+    @staticmethod
+    async def _planner_estimate(session: AsyncSession, query) -> int:
+        conn = await session.connection()
+        sql = query.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+        plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+        return int((json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]["Plan Rows"])
+
+    async def _fetch_page(self, session: AsyncSession, query, model, sort: str | None, page: int, per_page: int,
+                          cursor: str | None, total_mode: TotalMode = "exact", rank=None) -> Page:
+        filtered = rank is not None
+        sort = sort or "relevance"
+        if sort == "relevance" and not filtered:
+            sort = "id"
+        page_query = self._paginate(query, model, sort, page, per_page, cursor, rank=rank)
+        if sort == "relevance":
+            page_query = page_query.add_columns(rank.label("rank"))
+        if total_mode == "exact":
+            # The window is evaluated after the keyset WHERE, so cursor pages count the full filter instead.
+            counter = self._count_query(query, model).scalar_subquery() if cursor else func.count().over()
+            page_query = page_query.add_columns(counter.label("total"))
+        elif total_mode == "estimated" and not filtered:
+            page_query = page_query.add_columns(self._reltuples(model).label("total"))
+
+        rows = (await session.execute(page_query)).all()
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        items = rows
+        total = rows[0]._mapping.get("total") if rows else None
+
+        if total_mode == "exact" and total is None:
+            total = await session.scalar(self._count_query(query, model)) if cursor or page > 1 else 0
+        elif total_mode == "estimated":
+            if filtered:
+                total = await self._planner_estimate(session, query.with_only_columns(model.id).order_by(None))
+            if not cursor:
+                seen = (page - 1) * per_page + len(items)
+                total = max(total or 0, seen + 1) if has_more else seen
+            total = total or 0
+
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            value = last.rank if sort == "relevance" else getattr(last, sort)
+            next_cursor = encode_cursor(sort, value, last.id)
+        return Page(items, total, has_more, next_cursor)
+
+    async def _insert(self, model, values: dict):
+        """INSERT ... RETURNING in one round trip; a clash on ``UNIQUE_COLUMN`` raises DuplicateError."""
+        statement = insert(model).values(**values).returning(model)
+        if self.UNIQUE_COLUMN is not None:
+            statement = statement.on_conflict_do_nothing(index_elements=[getattr(model, self.UNIQUE_COLUMN)])
+        async with get_session() as session:
+            entity = await session.scalar(statement)
+        if entity is None:
+            raise DuplicateError(self.UNIQUE_COLUMN)
+        return entity
+
+    async def _update(self, model, entity_id: int, values: dict):
+        """UPDATE ... RETURNING the row; ``None`` values are left unchanged."""
+        values = {key: value for key, value in values.items() if value is not None}
+        try:
+            async with get_session(nested=True) as session:
+                if not values:
+                    return await session.get(model, entity_id)
+                statement = update(model).where(model.id == entity_id).values(**values).returning(model)
+                return await session.scalar(statement.execution_options(populate_existing=True))
+        except IntegrityError as e:
+            if self.UNIQUE_COLUMN is not None and getattr(e.orig, "sqlstate", None) == UNIQUE_VIOLATION:
+                raise DuplicateError(self.UNIQUE_COLUMN) from e
+            raise
+
+    @staticmethod
+    async def _delete(model, ids: list[int]) -> list[int]:
+        """DELETE ... RETURNING id; dependent rows go with ON DELETE CASCADE instead of being loaded."""
+        async with get_session() as session:
+            result = await session.execute(
+                delete(model).where(model.id.in_(ids)).returning(model.id),
+                execution_options={"synchronize_session": False},
+            )
+            return list(result.scalars())
+
+    @staticmethod
+    async def stream_rows(query, batch_size: int = 1000):
+        """Yield lists of row tuples from a server-side cursor, ``batch_size`` rows at a time."""
+        async with (await get_read_engine()).connect() as conn:
+            result = await conn.stream(query.execution_options(yield_per=batch_size))
+            async for partition in result.partitions():
+                yield partition
+
+    @staticmethod
+    @asynccontextmanager
+    async def bulk_connection():
+        """One connection for a whole import; callers commit after each chunk."""
+        async with engine.connect() as conn:
+            yield conn
+
+    async def _bulk_insert(self, conn: AsyncConnection, model, rows: list[dict]) -> set | None:
+        """COPY ``rows`` into a staging table and INSERT ... SELECT them; returns the inserted unique keys, if any."""
+        columns = [*self.IMPORT_COLUMNS, "created_at"]
+        staging = f"import_{model.__tablename__}"
+        source = ", ".join(columns)
+        await conn.exec_driver_sql(
+            f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS SELECT {source} FROM {model.__tablename__} WITH NO DATA"
+        )
+        now = datetime.utcnow()
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.copy_records_to_table(
+            staging, columns=columns, records=[(*(row[c] for c in self.IMPORT_COLUMNS), now) for row in rows]
+        )
+        statement = insert(model).from_select(columns, select(*table(staging, *map(column, columns)).c))
+        if self.UNIQUE_COLUMN is None:
+            await conn.execute(statement)
+            return None
+        unique = getattr(model, self.UNIQUE_COLUMN)
+        result = await conn.execute(statement.on_conflict_do_nothing(index_elements=[unique]).returning(unique))
+        return set(result.scalars())
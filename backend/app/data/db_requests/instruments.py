@@ -1,66 +1,57 @@
-from sqlalchemy import select, func, or_
-from backend.app.data.db import get_session
+from sqlalchemy.ext.asyncio import AsyncConnection
+from backend.app.data.db import get_read_session
+from backend.app.data.pagination import TotalMode
 from backend.app.data.db_requests.base import BaseRequests
+from backend.app.data.db_requests.loader import BatchLoader
 
 
 class InstrumentRequests(BaseRequests):
+    READ_COLUMNS = ("id", "name", "type", "brand", "condition", "created_at")
+    IMPORT_COLUMNS = ("name", "type", "brand", "condition")
+
+    def __init__(self):
+        self.loader = BatchLoader(self.get_many)
 
     async def get_by_id(self, instrument_id: int):
-        async with get_session() as session:
-            return await session.scalar(
-                select(self.Instrument).where(self.Instrument.id == instrument_id)
-            )
+        return await self.loader.load(instrument_id)
+
+    async def get_many(self, ids: list[int]):
+        async with get_read_session() as session:
+            query = self._read_query(self.Instrument).where(self._id_in(self.Instrument, ids))
+            return (await session.execute(query)).all()
 
-    async def get_list(self, page: int = 1, per_page: int = 10, search: str | None = None):
-        async with get_session() as session:
-            query = select(self.Instrument)
-            count_query = select(func.count(self.Instrument.id))
+    async def get_list(self, page: int = 1, per_page: int = 10, search: str | None = None,
+                       sort: str | None = None, cursor: str | None = None, total: TotalMode = "exact"):
+        async with get_read_session() as session:
+            query = self._read_query(self.Instrument)
 
+            rank = None
             if search:
-                search_filter = or_(
-                    self.Instrument.name.ilike(f"%{search}%"),
-                    self.Instrument.type.ilike(f"%{search}%"),
-                    self.Instrument.brand.ilike(f"%{search}%"),
-                    self.Instrument.condition.ilike(f"%{search}%"),
-                )
-                query = query.where(search_filter)
-                count_query = count_query.where(search_filter)
-
-            total = await session.scalar(count_query)
-            offset = (page - 1) * per_page
-            query = query.offset(offset).limit(per_page).order_by(self.Instrument.id)
-            result = await session.scalars(query)
-            return result.all(), total or 0
+                query = query.where(self._search_match(search, self.Instrument.search_text))
+                rank = self._search_rank(search, self.Instrument.search_text)
+
+            return await self._fetch_page(session, query, self.Instrument, sort, page, per_page, cursor,
+                                          total_mode=total, rank=rank)
 
     async def create(self, name: str, type: str, brand: str, condition: str):
-        async with get_session() as session:
-            instrument = self.Instrument(name=name, type=type, brand=brand, condition=condition)
-            session.add(instrument)
-            await session.flush()
-            await session.refresh(instrument)
-            return instrument
+        return await self._insert(self.Instrument, dict(name=name, type=type, brand=brand, condition=condition))
 
     async def update(self, instrument_id: int, name: str | None = None, type: str | None = None,
                      brand: str | None = None, condition: str | None = None):
-        async with get_session() as session:
-            instrument = await session.scalar(select(self.Instrument).where(self.Instrument.id == instrument_id))
-            if not instrument:
-                return None
-            if name: instrument.name = name
-            if type: instrument.type = type
-            if brand: instrument.brand = brand
-            if condition: instrument.condition = condition
-            await session.flush()
-            await session.refresh(instrument)
-            return instrument
+        return await self._update(self.Instrument, instrument_id,
+                                  dict(name=name, type=type, brand=brand, condition=condition))
+
+    def export_query(self):
+        return self._read_query(self.Instrument).order_by(self.Instrument.id)
+
+    async def bulk_insert(self, conn: AsyncConnection, rows: list[dict]):
+        return await self._bulk_insert(conn, self.Instrument, rows)
 
     async def delete(self, instrument_id: int) -> bool:
-        async with get_session() as session:
-            instrument = await session.scalar(select(self.Instrument).where(self.Instrument.id == instrument_id))
-            if not instrument:
-                return False
-            await session.delete(instrument)
-            return True
+        return bool(await self.delete_many([instrument_id]))
+
+    async def delete_many(self, ids: list[int]) -> list[int]:
+        return await self._delete(self.Instrument, ids)
 
 
 instrument_requests = InstrumentRequests()
@@ -0,0 +1,91 @@
+import asyncio
+import contextvars
+from operator import attrgetter
+from backend.app.data.db import current_request_session, detach_request_session, in_write_request, read_target
+
+
+class _Batch:
+    __slots__ = ("futures", "context", "sessions", "cancelled", "task")
+
+    def __init__(self, context: contextvars.Context):
+        self.futures: dict[object, asyncio.Future] = {}
+        self.context = context
+        self.sessions = set()
+        self.cancelled = False
+        self.task: asyncio.Task | None = None
+
+    @property
+    def shared(self) -> bool:
+        return len(self.sessions) > 1 or self.cancelled
+
+
+class BatchLoader:
+    """Coalesce ``load(key)`` calls made in the same event-loop tick into one ``fetch(keys)`` call.
+
+    Batches are keyed by read target and run in their first caller's context; a batch shared by
+    several requests uses its own session. Write requests skip batching.
+    """
+
+    def __init__(self, fetch, key=attrgetter("id")):
+        self._fetch = fetch
+        self._key = key
+        self._pending: dict[object, _Batch] = {}
+
+    async def load(self, key):
+        if in_write_request():
+            return (await self._fetch_now([key]))[0]
+        target = read_target()
+        batch = self._pending.get(target)
+        if batch is None:
+            if not self._pending:
+                asyncio.get_running_loop().call_soon(self._dispatch)
+            batch = self._pending[target] = _Batch(contextvars.copy_context())
+        batch.sessions.add(current_request_session())
+        future = batch.futures.get(key)
+        if future is None:
+            future = batch.futures[key] = asyncio.get_running_loop().create_future()
+        try:
+            # Shielded so one cancelled caller does not cancel the result for the others in its batch.
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # A batch still using this request's session must not outlive it.
+            if batch.task is None:
+                batch.cancelled = True
+            elif not batch.shared:
+                batch.task.cancel()
+            raise
+
+    async def load_many(self, keys) -> list:
+        if in_write_request():
+            return await self._fetch_now(list(keys))
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    async def _fetch_now(self, keys: list) -> list:
+        found = {self._key(item): item for item in await self._fetch(keys)}
+        return [found.get(key) for key in keys]
+
+    def _dispatch(self) -> None:
+        batches, self._pending = self._pending, {}
+        loop = asyncio.get_running_loop()
+        for batch in batches.values():
+            if batch.shared:
+                batch.context.run(detach_request_session)
+            batch.task = loop.create_task(self._run(batch.futures), context=batch.context)
+
+    async def _run(self, futures: dict) -> None:
+        try:
+            found = {self._key(item): item for item in await self._fetch(list(futures))}
+        except BaseException as e:
+            for future in futures.values():
+                if future.done():
+                    continue
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+            if not isinstance(e, Exception):
+                raise
+            return
+        for key, future in futures.items():
+            if not future.done():
+                future.set_result(found.get(key))
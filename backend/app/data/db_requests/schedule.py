@@ -1,89 +1,201 @@
-from datetime import time
-from sqlalchemy import select, func, or_
-from sqlalchemy.orm import selectinload
-from backend.app.data.db import get_session
+from datetime import datetime, time
+from sqlalchemy import select, func, or_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+from backend.app.data.db import after_commit, get_read_session, get_session
+from backend.app.data.models import SLOT_EPOCH
+from backend.app.data.occupancy import occupancy
+from backend.app.data.pagination import TotalMode
+from backend.app.data.timetable import timetables
 from backend.app.data.db_requests.base import BaseRequests
+from backend.app.data.db_requests.loader import BatchLoader
+
+
+EXCLUSION_VIOLATION = "23P01"
+CHECK_VIOLATION = "23514"
+# What building the generated slot raises for an inverted range, before the CHECK is reached.
+DATA_EXCEPTION = "22000"
+
+
+class ScheduleConflictError(Exception):
+    def __init__(self, conflicts: list):
+        super().__init__("Schedule entry overlaps existing lessons")
+        self.conflicts = conflicts
 
 
 class ScheduleRequests(BaseRequests):
+    READ_COLUMNS = ("id", "student_id", "teacher_id", "day_of_week", "start_time", "end_time", "room", "created_at")
+    TIMETABLE_COLUMNS = {"teacher": "teacher_id", "student": "student_id", "room": "room"}
+    CONFLICT_FIELDS = ("student_id", "teacher_id", "day_of_week", "start_time", "end_time", "room")
 
-    async def get_by_id(self, schedule_id: int):
-        async with get_session() as session:
-            return await session.scalar(
-                select(self.Schedule)
-                .options(selectinload(self.Schedule.student), selectinload(self.Schedule.teacher))
-                .where(self.Schedule.id == schedule_id)
+    def __init__(self):
+        self.loader = BatchLoader(self.get_many)
+
+    def _slot(self, start_time: time, end_time: time):
+        return func.tsrange(datetime.combine(SLOT_EPOCH, start_time), datetime.combine(SLOT_EPOCH, end_time))
+
+    def conflicts_query(self, student_id: int, teacher_id: int, day_of_week: str, start_time: time,
+                        end_time: time, room: str, exclude_id: int | None = None):
+        query = (
+            self._read_query(self.Schedule)
+            .where(
+                self.Schedule.day_of_week == day_of_week,
+                self.Schedule.slot.op("&&")(self._slot(start_time, end_time)),
+                or_(self.Schedule.teacher_id == teacher_id, self.Schedule.student_id == student_id,
+                    self.Schedule.room == room),
             )
+            .order_by(self.Schedule.start_time, self.Schedule.id)
+        )
+        if exclude_id is not None:
+            query = query.where(self.Schedule.id != exclude_id)
+        return query
 
-    async def get_list(self, page: int = 1, per_page: int = 10, search: str | None = None):
+    async def find_conflicts(self, student_id: int, teacher_id: int, day_of_week: str, start_time: time,
+                             end_time: time, room: str, exclude_id: int | None = None) -> list:
+        """Return (entry, [resource, ...]) pairs for lessons overlapping the given slot."""
+        query = self.conflicts_query(student_id, teacher_id, day_of_week, start_time, end_time, room, exclude_id)
         async with get_session() as session:
-            query = select(self.Schedule).options(
-                selectinload(self.Schedule.student), selectinload(self.Schedule.teacher)
-            )
-            count_query = select(func.count(self.Schedule.id))
+            entries = (await session.execute(query)).all()
+        return [
+            (entry, [resource for resource, same in (("teacher", entry.teacher_id == teacher_id),
+                                                     ("student", entry.student_id == student_id),
+                                                     ("room", entry.room == room)) if same])
+            for entry in entries
+        ]
+
+    async def _raise_conflicts(self, error: DBAPIError, values: dict, exclude_id: int | None = None):
+        sqlstate = getattr(error.orig, "sqlstate", None)
+        if sqlstate in (CHECK_VIOLATION, DATA_EXCEPTION):
+            raise ValueError("end_time must be after start_time") from error
+        if sqlstate != EXCLUSION_VIOLATION:
+            raise error
+        raise ScheduleConflictError(await self.find_conflicts(**values, exclude_id=exclude_id)) from error
+
+    def _read_query(self, model):
+        """The lesson's columns plus both participants' names, in one joined statement."""
+        return (
+            super()._read_query(model)
+            .add_columns(self.Student.full_name.label("student_name"), self.Teacher.full_name.label("teacher_name"))
+            .join(self.Schedule.student).join(self.Schedule.teacher)
+        )
+
+    async def get_by_id(self, schedule_id: int):
+        return await self.loader.load(schedule_id)
+
+    async def get_many(self, ids: list[int]):
+        async with get_read_session() as session:
+            query = self._read_query(self.Schedule).where(self._id_in(self.Schedule, ids))
+            return (await session.execute(query)).all()
+
+    async def get_list(self, page: int = 1, per_page: int = 10, search: str | None = None,
+                       sort: str | None = None, cursor: str | None = None, total: TotalMode = "exact"):
+        async with get_read_session() as session:
+            query = self._read_query(self.Schedule)
 
+            rank = None
             if search:
-                query = query.join(self.Schedule.student).join(self.Schedule.teacher)
-                count_query = count_query.select_from(self.Schedule).join(self.Schedule.student).join(self.Schedule.teacher)
-                search_filter = or_(
-                    self.Schedule.day_of_week.ilike(f"%{search}%"),
-                    self.Schedule.room.ilike(f"%{search}%"),
-                    self.Student.first_name.ilike(f"%{search}%"),
-                    self.Student.last_name.ilike(f"%{search}%"),
-                    self.Teacher.first_name.ilike(f"%{search}%"),
-                    self.Teacher.last_name.ilike(f"%{search}%"),
-                )
-                query = query.where(search_filter)
-                count_query = count_query.where(search_filter)
-
-            total = await session.scalar(count_query)
-            offset = (page - 1) * per_page
-            query = query.offset(offset).limit(per_page).order_by(self.Schedule.id)
-            result = await session.scalars(query)
-            return result.all(), total or 0
+                student_ids = select(self.Student.id).where(self._search_match(search, self.Student.full_name))
+                teacher_ids = select(self.Teacher.id).where(self._search_match(search, self.Teacher.full_name))
+                query = query.where(or_(
+                    self._search_match(search, self.Schedule.search_text),
+                    self.Schedule.student_id.in_(student_ids),
+                    self.Schedule.teacher_id.in_(teacher_ids),
+                ))
+                rank = self._search_rank(search, self.Schedule.search_text,
+                                         self.Student.full_name, self.Teacher.full_name)
 
-    async def create(self, student_id: int, teacher_id: int, day_of_week: str,
-                     start_time: time, end_time: time, room: str):
+            return await self._fetch_page(session, query, self.Schedule, sort, page, per_page, cursor,
+                                          total_mode=total, rank=rank)
+
+    async def get_timetable(self, kind: str, key) -> list[dict]:
+        """The week of a teacher, student or room by day, served from the per-entity cache."""
+        return await timetables.get(kind, key, self._fetch_timetable)
+
+    def timetable_query(self, kind: str, key):
+        column = getattr(self.Schedule, self.TIMETABLE_COLUMNS[kind])
+        return self._read_query(self.Schedule).where(column == key).order_by(
+            self.Schedule.day_of_week, self.Schedule.start_time, self.Schedule.id
+        )
+
+    async def _fetch_timetable(self, kind: str, key) -> list:
+        # From the primary, so a lagging replica is never cached.
         async with get_session() as session:
-            schedule = self.Schedule(
-                student_id=student_id, teacher_id=teacher_id, day_of_week=day_of_week,
-                start_time=start_time, end_time=end_time, room=room
-            )
-            session.add(schedule)
-            await session.flush()
-            return await session.scalar(
-                select(self.Schedule)
-                .options(selectinload(self.Schedule.student), selectinload(self.Schedule.teacher))
-                .where(self.Schedule.id == schedule.id)
+            return (await session.execute(self.timetable_query(kind, key))).all()
+
+    def export_query(self):
+        return (
+            select(
+                self.Schedule.id, self.Schedule.student_id, self.Student.full_name.label("student_name"),
+                self.Schedule.teacher_id, self.Teacher.full_name.label("teacher_name"),
+                self.Schedule.day_of_week, self.Schedule.start_time, self.Schedule.end_time,
+                self.Schedule.room, self.Schedule.created_at,
             )
+            .join(self.Schedule.student).join(self.Schedule.teacher)
+            .order_by(self.Schedule.id)
+        )
+
+    def _with_names(self, statement):
+        """Wrap an INSERT/UPDATE ... RETURNING in a CTE joined to the names, keeping the write one statement."""
+        written = statement.returning(*(getattr(self.Schedule, c) for c in self.READ_COLUMNS)).cte("written")
+        return (
+            select(written, self.Student.full_name.label("student_name"),
+                   self.Teacher.full_name.label("teacher_name"))
+            .join(self.Student, self.Student.id == written.c.student_id)
+            .join(self.Teacher, self.Teacher.id == written.c.teacher_id)
+        )
+
+    async def create(self, student_id: int, teacher_id: int, day_of_week: str,
+                     start_time: time, end_time: time, room: str):
+        values = dict(student_id=student_id, teacher_id=teacher_id, day_of_week=day_of_week,
+                      start_time=start_time, end_time=end_time, room=room)
+        try:
+            async with get_session(nested=True) as session:
+                schedule = (await session.execute(self._with_names(insert(self.Schedule).values(**values)))).one()
+        except DBAPIError as e:
+            await self._raise_conflicts(e, values)
+        lesson = occupancy.lesson_from(schedule)
+        after_commit(lambda: occupancy.put(schedule.id, lesson))
+        after_commit(lambda: timetables.put(schedule))
+        return schedule
 
     async def update(self, schedule_id: int, student_id: int | None = None, teacher_id: int | None = None,
                      day_of_week: str | None = None, start_time: time | None = None,
                      end_time: time | None = None, room: str | None = None):
-        async with get_session() as session:
-            schedule = await session.scalar(select(self.Schedule).where(self.Schedule.id == schedule_id))
-            if not schedule:
+        values = {key: value for key, value in dict(
+            student_id=student_id, teacher_id=teacher_id, day_of_week=day_of_week,
+            start_time=start_time, end_time=end_time, room=room
+        ).items() if value is not None}
+        if (start_time is None) != (end_time is None):
+            current = await self.get_by_id(schedule_id)
+            if current is None:
                 return None
-            if student_id: schedule.student_id = student_id
-            if teacher_id: schedule.teacher_id = teacher_id
-            if day_of_week: schedule.day_of_week = day_of_week
-            if start_time: schedule.start_time = start_time
-            if end_time: schedule.end_time = end_time
-            if room: schedule.room = room
-            await session.flush()
-            return await session.scalar(
-                select(self.Schedule)
-                .options(selectinload(self.Schedule.student), selectinload(self.Schedule.teacher))
-                .where(self.Schedule.id == schedule.id)
-            )
+            if (end_time or current.end_time) <= (start_time or current.start_time):
+                raise ValueError("end_time must be after start_time")
+        statement = update(self.Schedule).where(self.Schedule.id == schedule_id)
+        # An empty SET is not valid SQL.
+        statement = statement.values(**values) if values else statement.values(id=self.Schedule.id)
+        try:
+            async with get_session(nested=True) as session:
+                schedule = (await session.execute(self._with_names(statement))).one_or_none()
+        except DBAPIError as e:
+            current = await self.get_by_id(schedule_id)
+            merged = {c: values.get(c, getattr(current, c)) for c in self.CONFLICT_FIELDS}
+            await self._raise_conflicts(e, merged, exclude_id=schedule_id)
+        if schedule is None:
+            return None
+        lesson = occupancy.lesson_from(schedule)
+        after_commit(lambda: occupancy.put(schedule.id, lesson))
+        after_commit(lambda: timetables.put(schedule))
+        return schedule
 
     async def delete(self, schedule_id: int) -> bool:
-        async with get_session() as session:
-            schedule = await session.scalar(select(self.Schedule).where(self.Schedule.id == schedule_id))
-            if not schedule:
-                return False
-            await session.delete(schedule)
-            return True
+        return bool(await self.delete_many([schedule_id]))
+
+    async def delete_many(self, ids: list[int]) -> list[int]:
+        deleted = await self._delete(self.Schedule, ids)
+        after_commit(lambda: occupancy.discard(*deleted))
+        after_commit(lambda: timetables.discard(*deleted))
+        return deleted
 
 
 schedule_requests = ScheduleRequests()
@@ -1,77 +1,80 @@
 from datetime import date
-from sqlalchemy import select, func, or_
-from backend.app.data.db import get_session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncConnection
+from backend.app.data.db import after_commit, get_read_session
+from backend.app.data.occupancy import occupancy
+from backend.app.data.pagination import TotalMode
+from backend.app.data.timetable import timetables
 from backend.app.data.db_requests.base import BaseRequests
+from backend.app.data.db_requests.loader import BatchLoader
 
 
 class StudentRequests(BaseRequests):
+    READ_COLUMNS = ("id", "first_name", "last_name", "email", "phone", "birth_date", "created_at")
+    IMPORT_COLUMNS = ("first_name", "last_name", "email", "phone", "birth_date")
+    UNIQUE_COLUMN = "email"
+
+    def __init__(self):
+        self.loader = BatchLoader(self.get_many)
 
     async def get_by_id(self, student_id: int):
-        async with get_session() as session:
-            return await session.scalar(
-                select(self.Student).where(self.Student.id == student_id)
-            )
+        return await self.loader.load(student_id)
+
+    async def get_many(self, ids: list[int]):
+        async with get_read_session() as session:
+            query = self._read_query(self.Student).where(self._id_in(self.Student, ids))
+            return (await session.execute(query)).all()
 
     async def get_by_email(self, email: str):
-        async with get_session() as session:
+        async with get_read_session() as session:
             return await session.scalar(
                 select(self.Student).where(self.Student.email == email)
             )
 
-    async def get_list(self, page: int = 1, per_page: int = 10, search: str | None = None):
-        async with get_session() as session:
-            query = select(self.Student)
-            count_query = select(func.count(self.Student.id))
+    async def get_list(self, page: int = 1, per_page: int = 10, search: str | None = None,
+                       sort: str | None = None, cursor: str | None = None, total: TotalMode = "exact"):
+        async with get_read_session() as session:
+            query = self._read_query(self.Student)
 
+            rank = None
             if search:
-                search_filter = or_(
-                    self.Student.first_name.ilike(f"%{search}%"),
-                    self.Student.last_name.ilike(f"%{search}%"),
-                    self.Student.email.ilike(f"%{search}%"),
-                    self.Student.phone.ilike(f"%{search}%"),
-                )
-                query = query.where(search_filter)
-                count_query = count_query.where(search_filter)
-
-            total = await session.scalar(count_query)
-            offset = (page - 1) * per_page
-            query = query.offset(offset).limit(per_page).order_by(self.Student.id)
-            result = await session.scalars(query)
-            return result.all(), total or 0
+                query = query.where(self._search_match(search, self.Student.search_text))
+                rank = self._search_rank(search, self.Student.search_text)
+
+            return await self._fetch_page(session, query, self.Student, sort, page, per_page, cursor,
+                                          total_mode=total, rank=rank)
 
     async def create(self, first_name: str, last_name: str, email: str, phone: str, birth_date: date):
-        async with get_session() as session:
-            student = self.Student(
-                first_name=first_name, last_name=last_name,
-                email=email, phone=phone, birth_date=birth_date
-            )
-            session.add(student)
-            await session.flush()
-            await session.refresh(student)
-            return student
+        return await self._insert(self.Student, dict(
+            first_name=first_name, last_name=last_name,
+            email=email, phone=phone, birth_date=birth_date
+        ))
 
     async def update(self, student_id: int, first_name: str | None = None, last_name: str | None = None,
                      email: str | None = None, phone: str | None = None, birth_date: date | None = None):
-        async with get_session() as session:
-            student = await session.scalar(select(self.Student).where(self.Student.id == student_id))
-            if not student:
-                return None
-            if first_name: student.first_name = first_name
-            if last_name: student.last_name = last_name
-            if email: student.email = email
-            if phone: student.phone = phone
-            if birth_date: student.birth_date = birth_date
-            await session.flush()
-            await session.refresh(student)
-            return student
+        student = await self._update(self.Student, student_id, dict(
+            first_name=first_name, last_name=last_name,
+            email=email, phone=phone, birth_date=birth_date
+        ))
+        if student is not None and (first_name is not None or last_name is not None):
+            # Timetables show participants by name.
+            after_commit(lambda: timetables.drop_for("student", student_id))
+        return student
+
+    def export_query(self):
+        return self._read_query(self.Student).order_by(self.Student.id)
+
+    async def bulk_insert(self, conn: AsyncConnection, rows: list[dict]):
+        return await self._bulk_insert(conn, self.Student, rows)
 
     async def delete(self, student_id: int) -> bool:
-        async with get_session() as session:
-            student = await session.scalar(select(self.Student).where(self.Student.id == student_id))
-            if not student:
-                return False
-            await session.delete(student)
-            return True
+        return bool(await self.delete_many([student_id]))
+
+    async def delete_many(self, ids: list[int]) -> list[int]:
+        deleted = await self._delete(self.Student, ids)
+        after_commit(lambda: occupancy.discard_for("student", *deleted))
+        after_commit(lambda: timetables.drop_for("student", *deleted))
+        return deleted
 
 
 student_requests = StudentRequests()
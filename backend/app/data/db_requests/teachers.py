@@ -1,77 +1,79 @@
-from sqlalchemy import select, func, or_
-from backend.app.data.db import get_session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncConnection
+from backend.app.data.db import after_commit, get_read_session
+from backend.app.data.occupancy import occupancy
+from backend.app.data.pagination import TotalMode
+from backend.app.data.timetable import timetables
 from backend.app.data.db_requests.base import BaseRequests
+from backend.app.data.db_requests.loader import BatchLoader
 
 
 class TeacherRequests(BaseRequests):
+    READ_COLUMNS = ("id", "first_name", "last_name", "email", "phone", "specialization", "created_at")
+    IMPORT_COLUMNS = ("first_name", "last_name", "email", "phone", "specialization")
+    UNIQUE_COLUMN = "email"
+
+    def __init__(self):
+        self.loader = BatchLoader(self.get_many)
 
     async def get_by_id(self, teacher_id: int):
-        async with get_session() as session:
-            return await session.scalar(
-                select(self.Teacher).where(self.Teacher.id == teacher_id)
-            )
+        return await self.loader.load(teacher_id)
+
+    async def get_many(self, ids: list[int]):
+        async with get_read_session() as session:
+            query = self._read_query(self.Teacher).where(self._id_in(self.Teacher, ids))
+            return (await session.execute(query)).all()
 
     async def get_by_email(self, email: str):
-        async with get_session() as session:
+        async with get_read_session() as session:
             return await session.scalar(
                 select(self.Teacher).where(self.Teacher.email == email)
             )
 
-    async def get_list(self, page: int = 1, per_page: int = 10, search: str | None = None):
-        async with get_session() as session:
-            query = select(self.Teacher)
-            count_query = select(func.count(self.Teacher.id))
+    async def get_list(self, page: int = 1, per_page: int = 10, search: str | None = None,
+                       sort: str | None = None, cursor: str | None = None, total: TotalMode = "exact"):
+        async with get_read_session() as session:
+            query = self._read_query(self.Teacher)
 
+            rank = None
             if search:
-                search_filter = or_(
-                    self.Teacher.first_name.ilike(f"%{search}%"),
-                    self.Teacher.last_name.ilike(f"%{search}%"),
-                    self.Teacher.email.ilike(f"%{search}%"),
-                    self.Teacher.phone.ilike(f"%{search}%"),
-                    self.Teacher.specialization.ilike(f"%{search}%"),
-                )
-                query = query.where(search_filter)
-                count_query = count_query.where(search_filter)
-
-            total = await session.scalar(count_query)
-            offset = (page - 1) * per_page
-            query = query.offset(offset).limit(per_page).order_by(self.Teacher.id)
-            result = await session.scalars(query)
-            return result.all(), total or 0
+                query = query.where(self._search_match(search, self.Teacher.search_text))
+                rank = self._search_rank(search, self.Teacher.search_text)
+
+            return await self._fetch_page(session, query, self.Teacher, sort, page, per_page, cursor,
+                                          total_mode=total, rank=rank)
 
     async def create(self, first_name: str, last_name: str, email: str, phone: str, specialization: str):
-        async with get_session() as session:
-            teacher = self.Teacher(
-                first_name=first_name, last_name=last_name,
-                email=email, phone=phone, specialization=specialization
-            )
-            session.add(teacher)
-            await session.flush()
-            await session.refresh(teacher)
-            return teacher
+        return await self._insert(self.Teacher, dict(
+            first_name=first_name, last_name=last_name,
+            email=email, phone=phone, specialization=specialization
+        ))
 
     async def update(self, teacher_id: int, first_name: str | None = None, last_name: str | None = None,
                      email: str | None = None, phone: str | None = None, specialization: str | None = None):
-        async with get_session() as session:
-            teacher = await session.scalar(select(self.Teacher).where(self.Teacher.id == teacher_id))
-            if not teacher:
-                return None
-            if first_name: teacher.first_name = first_name
-            if last_name: teacher.last_name = last_name
-            if email: teacher.email = email
-            if phone: teacher.phone = phone
-            if specialization: teacher.specialization = specialization
-            await session.flush()
-            await session.refresh(teacher)
-            return teacher
+        teacher = await self._update(self.Teacher, teacher_id, dict(
+            first_name=first_name, last_name=last_name,
+            email=email, phone=phone, specialization=specialization
+        ))
+        if teacher is not None and (first_name is not None or last_name is not None):
+            # Timetables show participants by name.
+            after_commit(lambda: timetables.drop_for("teacher", teacher_id))
+        return teacher
+
+    def export_query(self):
+        return self._read_query(self.Teacher).order_by(self.Teacher.id)
+
+    async def bulk_insert(self, conn: AsyncConnection, rows: list[dict]):
+        return await self._bulk_insert(conn, self.Teacher, rows)
 
     async def delete(self, teacher_id: int) -> bool:
-        async with get_session() as session:
-            teacher = await session.scalar(select(self.Teacher).where(self.Teacher.id == teacher_id))
-            if not teacher:
-                return False
-            await session.delete(teacher)
-            return True
+        return bool(await self.delete_many([teacher_id]))
+
+    async def delete_many(self, ids: list[int]) -> list[int]:
+        deleted = await self._delete(self.Teacher, ids)
+        after_commit(lambda: occupancy.discard_for("teacher", *deleted))
+        after_commit(lambda: timetables.drop_for("teacher", *deleted))
+        return deleted
 
 
 teacher_requests = TeacherRequests()
@@ -1,25 +1,47 @@
-from sqlalchemy import select
-from backend.app.data.db import get_session
+from sqlalchemy import select, update
+from backend.app.config import settings
+from backend.app.data.cache import TTLCache
+from backend.app.data.db import after_commit, get_session
 from backend.app.data.db_requests.base import BaseRequests
 
 
 class UserRequests(BaseRequests):
+    UNIQUE_COLUMN = "email"
+
+    def __init__(self):
+        self._cache = TTLCache(settings.AUTH_USER_CACHE_SIZE, settings.AUTH_USER_CACHE_TTL)
 
     async def get_by_email(self, email: str):
         async with get_session() as session:
             return await session.scalar(select(self.User).where(self.User.email == email))
 
     async def get_by_id(self, user_id: int):
+        # On the primary, which a replica may lag behind for a freshly registered user.
         async with get_session() as session:
             return await session.scalar(select(self.User).where(self.User.id == user_id))
 
+    async def get_cached(self, user_id: int):
+        user = self._cache.get(user_id)
+        if user is None:
+            user = await self.get_by_id(user_id)
+            if user:
+                self._cache.set(user_id, user)
+        return user
+
+    def invalidate(self, user_id: int) -> None:
+        self._cache.pop(user_id)
+
     async def create(self, email: str, hashed_password: str):
+        user = await self._insert(self.User, dict(email=email, hashed_password=hashed_password))
+        after_commit(lambda: self.invalidate(user.id))
+        return user
+
+    async def update_password(self, user_id: int, hashed_password: str) -> None:
         async with get_session() as session:
-            user = self.User(email=email, hashed_password=hashed_password)
-            session.add(user)
-            await session.flush()
-            await session.refresh(user)
-            return user
+            await session.execute(
+                update(self.User).where(self.User.id == user_id).values(hashed_password=hashed_password)
+            )
+        after_commit(lambda: self.invalidate(user_id))
 
 
 user_requests = UserRequests()
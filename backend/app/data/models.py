@@ -1,10 +1,56 @@
 from datetime import datetime, date, time
 
-from sqlalchemy import String, ForeignKey, Date, Time
+from sqlalchemy import (
+    BigInteger, String, Text, ForeignKey, Date, DateTime, Time, Index, Computed, CheckConstraint, SmallInteger,
+    TypeDecorator, func,
+)
+from sqlalchemy.dialects.postgresql import ExcludeConstraint, TSRANGE
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from backend.app.data.db import Base
 
+# Lesson times are projected onto this date so weekly slots can be compared as tsrange values.
+SLOT_EPOCH = date(2000, 1, 1)
+WEEKDAYS = ("Понедельник", "Вторник", "Среда", "Четверг", "Пятница", "Суббота", "Воскресенье")
+# The day names indexed by ordinal in SQL, e.g. for the schedule search text.
+WEEKDAY_NAMES_SQL = "(ARRAY[" + ", ".join(f"'{day}'" for day in WEEKDAYS) + "]::text[])"
+
+
+def weekday_ordinal(value) -> int:
+    """ISO ordinal (1 = Monday) of a weekday given as a name, in any case, or as the ordinal itself."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        if 1 <= value <= len(WEEKDAYS):
+            return value
+    elif isinstance(value, str):
+        name = value.strip().capitalize()
+        if name in WEEKDAYS:
+            return WEEKDAYS.index(name) + 1
+        if name.isdigit():
+            return weekday_ordinal(int(name))
+    raise ValueError(f"Unknown weekday: {value!r}")
+
+
+class Weekday(TypeDecorator):
+    """Weekday stored as a smallint ordinal, so it sorts and range-queries; Python sees the name."""
+
+    impl = SmallInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else weekday_ordinal(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else WEEKDAYS[value - 1]
+
+
+def _trgm_index(table: str, column: str) -> Index:
+    return Index(f"ix_{table}_{column}_trgm", column, postgresql_using="gin",
+                 postgresql_ops={column: "gin_trgm_ops"})
+
+
+def _generated(expression: str):
+    return mapped_column(Text, Computed(expression, persisted=True), deferred=True)
+
 
 class User(Base):
     __tablename__ = "users"
@@ -17,6 +63,12 @@ class User(Base):
 
 class Student(Base):
     __tablename__ = "students"
+    __table_args__ = (
+        Index("ix_students_last_name_id", "last_name", "id"),
+        Index("ix_students_created_at_id", "created_at", "id"),
+        _trgm_index("students", "full_name"),
+        _trgm_index("students", "search_text"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     first_name: Mapped[str] = mapped_column(String(100))
@@ -25,14 +77,23 @@ class Student(Base):
     phone: Mapped[str] = mapped_column(String(20))
     birth_date: Mapped[date] = mapped_column(Date)
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    full_name: Mapped[str] = _generated("first_name || ' ' || last_name")
+    search_text: Mapped[str] = _generated("first_name || ' ' || last_name || ' ' || email || ' ' || phone")
 
     schedule_entries: Mapped[list["Schedule"]] = relationship(
-        "Schedule", back_populates="student", cascade="all, delete-orphan"
+        "Schedule", back_populates="student", cascade="all, delete-orphan", passive_deletes=True
     )
 
 
 class Teacher(Base):
     __tablename__ = "teachers"
+    __table_args__ = (
+        Index("ix_teachers_last_name_id", "last_name", "id"),
+        Index("ix_teachers_specialization_id", "specialization", "id"),
+        Index("ix_teachers_created_at_id", "created_at", "id"),
+        _trgm_index("teachers", "full_name"),
+        _trgm_index("teachers", "search_text"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     first_name: Mapped[str] = mapped_column(String(100))
@@ -41,14 +102,24 @@ class Teacher(Base):
     phone: Mapped[str] = mapped_column(String(20))
     specialization: Mapped[str] = mapped_column(String(100))
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    full_name: Mapped[str] = _generated("first_name || ' ' || last_name")
+    search_text: Mapped[str] = _generated(
+        "first_name || ' ' || last_name || ' ' || email || ' ' || phone || ' ' || specialization"
+    )
 
     schedule_entries: Mapped[list["Schedule"]] = relationship(
-        "Schedule", back_populates="teacher", cascade="all, delete-orphan"
+        "Schedule", back_populates="teacher", cascade="all, delete-orphan", passive_deletes=True
     )
 
 
 class Instrument(Base):
     __tablename__ = "instruments"
+    __table_args__ = (
+        Index("ix_instruments_name_id", "name", "id"),
+        Index("ix_instruments_type_id", "type", "id"),
+        Index("ix_instruments_created_at_id", "created_at", "id"),
+        _trgm_index("instruments", "search_text"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
     name: Mapped[str] = mapped_column(String(100))
@@ -56,27 +127,61 @@ class Instrument(Base):
     brand: Mapped[str] = mapped_column(String(100))
     condition: Mapped[str] = mapped_column(String(50))
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    search_text: Mapped[str] = _generated("name || ' ' || type || ' ' || brand || ' ' || condition")
 
 
 class Schedule(Base):
     __tablename__ = "schedule"
+    __table_args__ = (
+        Index("ix_schedule_start_time_id", "start_time", "id"),
+        Index("ix_schedule_room_id", "room", "id"),
+        Index("ix_schedule_created_at_id", "created_at", "id"),
+        # Per-participant and per-room lookups: timetables, FK cascades and overlap checks.
+        Index("ix_schedule_teacher_day_start", "teacher_id", "day_of_week", "start_time"),
+        Index("ix_schedule_student_day_start", "student_id", "day_of_week", "start_time"),
+        Index("ix_schedule_room_day_start", "room", "day_of_week", "start_time"),
+        _trgm_index("schedule", "search_text"),
+        CheckConstraint("end_time > start_time", name="ck_schedule_time_order"),
+        CheckConstraint(f"day_of_week BETWEEN 1 AND {len(WEEKDAYS)}", name="ck_schedule_day_of_week"),
+        ExcludeConstraint(("teacher_id", "="), ("day_of_week", "="), ("slot", "&&"),
+                          name="ex_schedule_teacher_overlap", using="gist"),
+        ExcludeConstraint(("student_id", "="), ("day_of_week", "="), ("slot", "&&"),
+                          name="ex_schedule_student_overlap", using="gist"),
+        ExcludeConstraint(("room", "="), ("day_of_week", "="), ("slot", "&&"),
+                          name="ex_schedule_room_overlap", using="gist"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    student_id: Mapped[int] = mapped_column(ForeignKey("students.id"))
-    teacher_id: Mapped[int] = mapped_column(ForeignKey("teachers.id"))
-    day_of_week: Mapped[str] = mapped_column(String(20))
+    student_id: Mapped[int] = mapped_column(ForeignKey("students.id", ondelete="CASCADE"))
+    teacher_id: Mapped[int] = mapped_column(ForeignKey("teachers.id", ondelete="CASCADE"))
+    day_of_week: Mapped[str] = mapped_column(Weekday)
     start_time: Mapped[time] = mapped_column(Time)
     end_time: Mapped[time] = mapped_column(Time)
     room: Mapped[str] = mapped_column(String(50))
     created_at: Mapped[datetime] = mapped_column(default=datetime.utcnow)
+    search_text: Mapped[str] = _generated(f"{WEEKDAY_NAMES_SQL}[day_of_week] || ' ' || room")
+    slot = mapped_column(TSRANGE, Computed(
+        f"tsrange(DATE '{SLOT_EPOCH}' + start_time, DATE '{SLOT_EPOCH}' + end_time)", persisted=True
+    ), deferred=True)
 
     student: Mapped["Student"] = relationship("Student", back_populates="schedule_entries")
     teacher: Mapped["Teacher"] = relationship("Teacher", back_populates="schedule_entries")
 
 
+class TableVersion(Base):
+    """Bumped by statement-level triggers on every write to ``table_name``, one row per connection slot (see data/versions.py)."""
+    __tablename__ = "table_versions"
+
+    table_name: Mapped[str] = mapped_column(String(63), primary_key=True)
+    slot: Mapped[int] = mapped_column(SmallInteger, primary_key=True, default=0)
+    version: Mapped[int] = mapped_column(BigInteger, default=0)
+    changed_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
 class Models:
     User = User
     Student = Student
     Teacher = Teacher
     Instrument = Instrument
     Schedule = Schedule
+    TableVersion = TableVersion
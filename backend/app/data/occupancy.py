@@ -0,0 +1,175 @@
+import asyncio
+from datetime import time
+from typing import NamedTuple
+from sqlalchemy import select
+from backend.app.data.db import get_session
+from backend.app.data.models import Schedule
+from backend.app.data.versions import stamp_query
+
+MINUTES_PER_DAY = 24 * 60
+
+
+class Lesson(NamedTuple):
+    teacher_id: int
+    student_id: int
+    room: str
+    day_of_week: str
+    start: int
+    end: int
+
+
+def to_minute(value: time, round_up: bool = False) -> int:
+    minute = value.hour * 60 + value.minute
+    return minute + 1 if round_up and (value.second or value.microsecond) else minute
+
+
+def from_minute(minute: int) -> time:
+    return time(23, 59, 59) if minute >= MINUTES_PER_DAY else time(minute // 60, minute % 60)
+
+
+def span_mask(start: int, end: int) -> int:
+    return ((1 << (end - start)) - 1) << start if end > start else 0
+
+
+def free_runs(free: int, min_length: int):
+    """Yield (start, end) minute runs of set bits at least ``min_length`` long."""
+    while free:
+        start = (free & -free).bit_length() - 1
+        shifted = free >> start
+        length = ((shifted + 1) & ~shifted).bit_length() - 1
+        if length >= min_length:
+            yield start, start + length
+        free &= ~span_mask(start, start + length)
+
+
+class OccupancyIndex:
+    """Per-minute weekly occupancy bitsets (weekday -> int, bit ``m`` = minute ``m`` taken) per resource.
+
+    Local writes are patched in; the index is rebuilt when the ``schedule`` stamp shows another writer.
+    """
+
+    def __init__(self):
+        self._bits: dict[tuple[str, object], dict[str, int]] = {}
+        self._lessons: dict[int, Lesson] = {}
+        # Lesson ids per (resource, weekday), to restore minutes shared with a discarded neighbour.
+        self._members: dict[tuple[tuple[str, object], str], set[int]] = {}
+        # The schedule stamp the bitsets reflect, None when unknown.
+        self._version: int | None = None
+        self._lock = asyncio.Lock()
+        # Writes applied while a rebuild's SELECT is in flight, replayed onto the rebuilt index.
+        self._journal: list[tuple] | None = None
+
+    @staticmethod
+    def _resources(lesson: Lesson):
+        return ("teacher", lesson.teacher_id), ("student", lesson.student_id), ("room", lesson.room)
+
+    def _toggle(self, entry_id: int, lesson: Lesson, occupied: bool) -> None:
+        day = lesson.day_of_week
+        mask = span_mask(lesson.start, lesson.end)
+        for resource in self._resources(lesson):
+            days = self._bits.setdefault(resource, {})
+            members = self._members.setdefault((resource, day), set())
+            if occupied:
+                members.add(entry_id)
+                days[day] = days.get(day, 0) | mask
+                continue
+            members.discard(entry_id)
+            bits = days.get(day, 0) & ~mask
+            # Rounded end times can share a minute with a neighbour; put back what is still theirs.
+            for other_id in members:
+                other = self._lessons[other_id]
+                bits |= span_mask(other.start, other.end) & mask
+            days[day] = bits
+
+    @staticmethod
+    def lesson_from(entry) -> Lesson:
+        return Lesson(entry.teacher_id, entry.student_id, entry.room, entry.day_of_week,
+                      to_minute(entry.start_time), to_minute(entry.end_time, round_up=True))
+
+    @staticmethod
+    async def _stamp() -> int:
+        async with get_session() as session:
+            return int((await session.execute(stamp_query(("schedule",)))).one()[0])
+
+    async def ensure_fresh(self) -> None:
+        # Read before the rows, so a write that slips in between only costs another rebuild.
+        version = await self._stamp()
+        if version == self._version:
+            return
+        async with self._lock:
+            if version == self._version:
+                return
+            self._journal = []
+            try:
+                async with get_session() as session:
+                    rows = (await session.execute(select(
+                        Schedule.id, Schedule.teacher_id, Schedule.student_id, Schedule.room,
+                        Schedule.day_of_week, Schedule.start_time, Schedule.end_time,
+                    ))).all()
+            finally:
+                journal, self._journal = self._journal, None
+            self._bits, self._lessons, self._members = {}, {}, {}
+            for row in rows:
+                self._put(row.id, self.lesson_from(row))
+            # Writes committed during the SELECT may be missing from it; put and discard are idempotent.
+            for method, args in journal:
+                method(*args)
+            self._version = version
+
+    def _apply(self, method, *args, bumps: int | None = 1) -> None:
+        if self._journal is not None:
+            self._journal.append((method, args))
+        method(*args)
+        if self._version is not None:
+            self._version = self._version + bumps if bumps is not None else None
+
+    def put(self, entry_id: int, lesson: Lesson) -> None:
+        """Apply a committed INSERT or UPDATE of one lesson, one statement on ``schedule``."""
+        self._apply(self._put, entry_id, lesson)
+
+    def discard(self, *entry_ids: int) -> None:
+        """Apply a committed DELETE of lessons, one statement on ``schedule``."""
+        self._apply(self._discard, entry_ids)
+
+    def discard_for(self, kind: str, *keys) -> None:
+        # Cascades bump the stamp an unknown number of times, so the next check rebuilds.
+        self._apply(self._discard_for, kind, keys, bumps=None)
+
+    def _put(self, entry_id: int, lesson: Lesson) -> None:
+        self._discard((entry_id,))
+        self._lessons[entry_id] = lesson
+        self._toggle(entry_id, lesson, occupied=True)
+
+    def _discard(self, entry_ids) -> None:
+        for entry_id in entry_ids:
+            lesson = self._lessons.pop(entry_id, None)
+            if lesson is not None:
+                self._toggle(entry_id, lesson, occupied=False)
+
+    def _discard_for(self, kind: str, keys) -> None:
+        resources = {(kind, key) for key in keys}
+        self._discard([i for i, lesson in self._lessons.items() if resources.intersection(self._resources(lesson))])
+
+    def rooms(self) -> list[str]:
+        return sorted(key for kind, key in self._bits if kind == "room")
+
+    def occupied(self, kind: str, key, day_of_week: str) -> int:
+        return self._bits.get((kind, key), {}).get(day_of_week, 0)
+
+    def free_intervals(self, duration: int, days: list[str], work_start: time, work_end: time,
+                       teacher_id: int | None = None, student_id: int | None = None,
+                       rooms: list[str | None] | None = None) -> list[dict]:
+        window = span_mask(to_minute(work_start), to_minute(work_end, round_up=True))
+        result = []
+        for day in days:
+            busy = self.occupied("teacher", teacher_id, day) | self.occupied("student", student_id, day)
+            for room in rooms or [None]:
+                free = window & ~(busy | self.occupied("room", room, day))
+                result.extend(
+                    {"day_of_week": day, "room": room, "start_time": from_minute(start), "end_time": from_minute(end)}
+                    for start, end in free_runs(free, duration)
+                )
+        return result
+
+
+occupancy = OccupancyIndex()
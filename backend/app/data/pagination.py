@@ -0,0 +1,59 @@
+import base64
+import json
+import math
+from datetime import date, datetime, time
+from typing import Literal, NamedTuple
+
+TotalMode = Literal["exact", "estimated", "none"]
+MAX_BATCH_IDS = 1000
+MAX_ID = 2**31 - 1
+
+
+class Page(NamedTuple):
+    items: list
+    total: int | None
+    has_more: bool
+    next_cursor: str | None
+
+
+def encode_cursor(sort: str, value, last_id: int) -> str:
+    if isinstance(value, (date, datetime, time)):
+        value = value.isoformat()
+    raw = json.dumps([sort, value, last_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[str, object, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        sort, value, last_id = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if (not isinstance(sort, str) or type(last_id) is not int or not 1 <= last_id <= MAX_ID
+            or not isinstance(value, (str, int, float)) or isinstance(value, bool)):
+        raise ValueError("Invalid cursor")
+    return sort, value, last_id
+
+
+def build_page(result: Page, page: int, per_page: int, cursor: str | None) -> dict:
+    total = result.total
+    return {"items": result.items, "total": total,
+            "page": None if cursor else page, "per_page": per_page,
+            "pages": (math.ceil(total / per_page) if total > 0 else 1) if total is not None else None,
+            "has_more": result.has_more, "next_cursor": result.next_cursor}
+
+
+def parse_ids(value: str) -> list[int]:
+    """Parse ``?ids=1,2,3`` keeping the caller's order and dropping repeats."""
+    try:
+        ids = list(dict.fromkeys(int(part) for part in value.split(",") if part.strip()))
+    except ValueError as e:
+        raise ValueError("Invalid ids") from e
+    if not ids or len(ids) > MAX_BATCH_IDS:
+        raise ValueError(f"Between 1 and {MAX_BATCH_IDS} ids expected")
+    return ids
+
+
+def build_batch(items: list) -> dict:
+    return {"items": items, "total": len(items), "page": 1, "per_page": max(len(items), 1), "pages": 1,
+            "has_more": False, "next_cursor": None}
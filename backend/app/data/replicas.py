@@ -0,0 +1,84 @@
+import asyncio
+import time
+from sqlalchemy import exc, text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+from backend.app.config import settings
+
+# Seconds behind; zero when caught up or not a standby.
+LAG_SQL = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+""")
+CONNECT_ERRORS = (OSError, asyncio.TimeoutError, exc.DBAPIError)
+
+
+class Replica:
+    __slots__ = ("engine", "sessionmaker", "lag", "checked_at", "down_until", "checking")
+
+    def __init__(self, engine: AsyncEngine):
+        self.engine = engine
+        self.sessionmaker = async_sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+        self.lag: float | None = None
+        self.checked_at = float("-inf")
+        self.down_until = float("-inf")
+        self.checking = False
+
+    def status(self) -> dict:
+        return {"lag_seconds": self.lag, "down": self.down_until > time.monotonic()}
+
+
+class ReplicaSet:
+    """Read replicas taken in turn, skipping any that are down or more than ``REPLICA_MAX_LAG`` behind."""
+
+    def __init__(self, engines: list[AsyncEngine]):
+        self._replicas = [Replica(engine) for engine in engines]
+        self._next = 0
+
+    def __len__(self) -> int:
+        return len(self._replicas)
+
+    def __iter__(self):
+        return iter(self._replicas)
+
+    async def choose(self) -> Replica | None:
+        for offset in range(len(self._replicas)):
+            index = (self._next + offset) % len(self._replicas)
+            replica = self._replicas[index]
+            if await self._usable(replica):
+                self._next = index + 1
+                return replica
+        return None
+
+    async def _usable(self, replica: Replica) -> bool:
+        now = time.monotonic()
+        if replica.down_until > now:
+            return False
+        if now - replica.checked_at >= settings.REPLICA_CHECK_INTERVAL and not replica.checking:
+            await self._check(replica)
+        return replica.lag is not None and replica.lag <= settings.REPLICA_MAX_LAG
+
+    async def _check(self, replica: Replica) -> None:
+        replica.checking = True
+        try:
+            async with replica.engine.connect() as conn:
+                lag = await asyncio.wait_for(conn.scalar(LAG_SQL), settings.REPLICA_CHECK_TIMEOUT)
+            replica.lag = float(lag)
+        except CONNECT_ERRORS:
+            self.mark_down(replica)
+        finally:
+            replica.checked_at = time.monotonic()
+            replica.checking = False
+
+    @staticmethod
+    def mark_down(replica: Replica) -> None:
+        replica.lag = None
+        replica.down_until = time.monotonic() + settings.REPLICA_RETRY_AFTER
+
+    def status(self) -> list[dict]:
+        return [replica.status() for replica in self._replicas]
+
+    async def dispose(self) -> None:
+        for replica in self._replicas:
+            await replica.engine.dispose()
@@ -0,0 +1,99 @@
+import time as clock
+from collections import OrderedDict
+from typing import Awaitable, Callable
+from backend.app.config import settings
+from backend.app.data.models import WEEKDAYS
+
+_DAY_ORDER = {day: position for position, day in enumerate(WEEKDAYS)}
+
+
+def group_by_day(lessons) -> list[dict]:
+    """Every weekday in order with its lessons by start time; unknown day names follow the week."""
+    days = {day: [] for day in WEEKDAYS}
+    for lesson in sorted(lessons, key=lambda r: (_DAY_ORDER.get(r.day_of_week, len(WEEKDAYS)), r.day_of_week,
+                                                 r.start_time, r.id)):
+        days.setdefault(lesson.day_of_week, []).append(lesson)
+    return [{"day_of_week": day, "lessons": day_lessons} for day, day_lessons in days.items()]
+
+
+class _Timetable:
+    __slots__ = ("lessons", "built_at", "days")
+
+    def __init__(self, lessons: dict, built_at: float):
+        self.lessons = lessons
+        self.built_at = built_at
+        self.days: list[dict] | None = None
+
+
+class TimetableCache:
+    """Weekly timetables of teachers, students and rooms, patched in place by local lesson writes.
+
+    Entries older than ``TIMETABLE_MAX_AGE`` seconds are refetched.
+    """
+
+    def __init__(self):
+        self._timetables: OrderedDict[tuple[str, object], _Timetable] = OrderedDict()
+        # Bumped by every write, so a fetch that raced one is served but not cached.
+        self._generation = 0
+
+    def __len__(self) -> int:
+        return len(self._timetables)
+
+    @staticmethod
+    def _resources(lesson):
+        return ("teacher", lesson.teacher_id), ("student", lesson.student_id), ("room", lesson.room)
+
+    async def get(self, kind: str, key, fetch: Callable[[str, object], Awaitable[list]]) -> list[dict]:
+        resource = (kind, key)
+        timetable = self._timetables.get(resource)
+        if timetable is not None and clock.monotonic() - timetable.built_at < settings.TIMETABLE_MAX_AGE:
+            self._timetables.move_to_end(resource)
+        else:
+            generation = self._generation
+            lessons = await fetch(kind, key)
+            timetable = _Timetable({lesson.id: lesson for lesson in lessons}, clock.monotonic())
+            if generation == self._generation:
+                self._store(resource, timetable)
+        if timetable.days is None:
+            timetable.days = group_by_day(timetable.lessons.values())
+        return timetable.days
+
+    def _store(self, resource: tuple[str, object], timetable: _Timetable) -> None:
+        if settings.TIMETABLE_CACHE_SIZE <= 0:
+            return
+        self._timetables[resource] = timetable
+        self._timetables.move_to_end(resource)
+        while len(self._timetables) > settings.TIMETABLE_CACHE_SIZE:
+            self._timetables.popitem(last=False)
+
+    def put(self, lesson) -> None:
+        self.discard(lesson.id)
+        for resource in self._resources(lesson):
+            timetable = self._timetables.get(resource)
+            if timetable is not None:
+                timetable.lessons[lesson.id] = lesson
+                timetable.days = None
+
+    def discard(self, *lesson_ids: int) -> None:
+        self._generation += 1
+        for timetable in self._timetables.values():
+            for lesson_id in lesson_ids:
+                if timetable.lessons.pop(lesson_id, None) is not None:
+                    timetable.days = None
+
+    def drop_for(self, kind: str, *keys) -> None:
+        """Forget the timetables of these participants and every timetable with a lesson of theirs."""
+        self._generation += 1
+        resources = {(kind, key) for key in keys}
+        stale = [resource for resource, timetable in self._timetables.items()
+                 if resource in resources or any(resources.intersection(self._resources(lesson))
+                                                 for lesson in timetable.lessons.values())]
+        for resource in stale:
+            del self._timetables[resource]
+
+    def clear(self) -> None:
+        self._generation += 1
+        self._timetables.clear()
+
+
+timetables = TimetableCache()
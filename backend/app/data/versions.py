@@ -0,0 +1,56 @@
+from datetime import datetime
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection
+from backend.app.data.db import get_read_session
+from backend.app.data.models import TableVersion
+
+VERSIONED_TABLES = ("students", "teachers", "instruments", "schedule")
+
+# Statement-level, one slot row per connection so writers never wait on each other; the version is the sum.
+VERSION_SLOTS = 1024
+VERSION_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO table_versions (table_name, slot, version, changed_at)
+    VALUES (TG_TABLE_NAME, pg_backend_pid() % {VERSION_SLOTS}, 1, now())
+    ON CONFLICT (table_name, slot) DO UPDATE SET version = table_versions.version + 1, changed_at = now();
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+
+def version_trigger(table: str) -> list[str]:
+    return [
+        f"DROP TRIGGER IF EXISTS {table}_bump_version ON {table}",
+        f"CREATE TRIGGER {table}_bump_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+        f"FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()",
+    ]
+
+
+# Seeding with now() keeps ETags from a previous database from matching a freshly created one.
+SEED_VERSIONS = (
+    "INSERT INTO table_versions (table_name, slot, version, changed_at) "
+    f"SELECT name, 0, 1, now() FROM unnest(ARRAY{list(VERSIONED_TABLES)}) AS name "
+    "ON CONFLICT (table_name, slot) DO NOTHING"
+)
+
+
+async def install_version_triggers(conn: AsyncConnection) -> None:
+    await conn.exec_driver_sql(VERSION_FUNCTION)
+    await conn.exec_driver_sql(SEED_VERSIONS)
+    for table in VERSIONED_TABLES:
+        for statement in version_trigger(table):
+            await conn.exec_driver_sql(statement)
+
+
+async def table_stamp(tables: tuple[str, ...]) -> tuple[int, datetime | None]:
+    """Sum of the tables' versions and the latest change time, read from where the rows are."""
+    async with get_read_session() as session:
+        row = (await session.execute(stamp_query(tables))).one()
+    return int(row[0]), row[1]
+
+
+def stamp_query(tables: tuple[str, ...]):
+    return (select(func.coalesce(func.sum(TableVersion.version), 0), func.max(TableVersion.changed_at))
+            .where(TableVersion.table_name.in_(tables)))
@@ -1,29 +1,45 @@
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI, Request, Response
+from sqlalchemy import exc, text
 from fastapi.middleware.cors import CORSMiddleware
 from backend.app.routers import auth, students, teachers, instruments, schedule
-from backend.app.data.db import engine, Base
+from backend.app.data.db import engine, Base, pool_status, replicas, request_session
 from backend.app.data import models
+from backend.app.data.versions import install_version_triggers
+from backend.app.config import settings
+from backend.app.utils.admission import AdmissionMiddleware, overloaded_response
+from backend.app.utils.compression import CompressionMiddleware
+from backend.app.utils.hashing import shutdown_hashing
+from backend.app.utils.metrics import CONTENT_TYPE, MetricsMiddleware, render_metrics
 
 
 async def init_db():
     async with engine.begin() as conn:
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS btree_gist"))
         await conn.run_sync(Base.metadata.create_all)
+        await install_version_triggers(conn)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
     yield
+    shutdown_hashing()
+    await replicas.dispose()
 
 
 app = FastAPI(
     title="Музыкальная школа API",
     description="API для управления учениками, преподавателями, инструментами и расписанием",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    dependencies=[Depends(request_session, scope="function")],
 )
 
+# Innermost, so shed requests still get CORS headers and metrics.
+app.add_middleware(AdmissionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://127.0.0.1:3000", "http://frontend:3000"],
@@ -32,6 +48,30 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(MetricsMiddleware)
+
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+        compresslevel=settings.COMPRESSION_GZIP_LEVEL,
+        brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    )
+
+
+@app.exception_handler(exc.DBAPIError)
+async def statement_timeout_handler(request: Request, error: exc.DBAPIError):
+    # 57014 is query_canceled: the route group's statement_timeout ran out.
+    if getattr(error.orig, "sqlstate", None) != "57014":
+        raise error
+    return overloaded_response("Запрос к базе данных превысил лимит времени")
+
+
+@app.exception_handler(exc.TimeoutError)
+async def pool_timeout_handler(request: Request, error: exc.TimeoutError):
+    return overloaded_response("Нет свободных соединений с базой данных")
+
+
 app.include_router(auth.router)
 app.include_router(students.router)
 app.include_router(teachers.router)
@@ -42,3 +82,13 @@ app.include_router(schedule.router)
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/health/pool")
+async def pool_health():
+    return pool_status()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(render_metrics(), media_type=CONTENT_TYPE)
@@ -2,27 +2,33 @@ from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from backend.app.data.models import User
+from backend.app.data.db_requests.base import DuplicateError
 from backend.app.data.db_requests.users import user_requests
 from backend.app.schemas.user import Token, UserCreate, UserResponse
-from backend.app.utils.security import create_access_token, get_current_user, hash_password, verify_password
+from backend.app.utils.hashing import hash_password_async, password_needs_rehash, verify_password_async
+from backend.app.utils.security import create_user_token, get_current_user
 
 router = APIRouter(prefix="/api/auth", tags=["Аутентификация"])
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(user_data: UserCreate):
-    if await user_requests.get_by_email(user_data.email):
+    hashed_password = await hash_password_async(user_data.password)
+    try:
+        return await user_requests.create(email=user_data.email, hashed_password=hashed_password)
+    except DuplicateError:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
-    return await user_requests.create(email=user_data.email, hashed_password=hash_password(user_data.password))
 
 
 @router.post("/login", response_model=Token)
 async def login(form_data: Annotated[OAuth2PasswordRequestForm, Depends()]):
     user = await user_requests.get_by_email(form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials",
                             headers={"WWW-Authenticate": "Bearer"})
-    return {"access_token": create_access_token(data={"sub": str(user.id)}), "token_type": "bearer"}
+    if password_needs_rehash(user.hashed_password):
+        await user_requests.update_password(user.id, await hash_password_async(form_data.password))
+    return {"access_token": create_user_token(user), "token_type": "bearer"}
 
 
 @router.get("/me", response_model=UserResponse)
@@ -1,27 +1,59 @@
-import math
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
 from backend.app.data.models import User
 from backend.app.data.db_requests.instruments import instrument_requests
-from backend.app.schemas.instrument import InstrumentCreate, InstrumentUpdate, InstrumentResponse
-from backend.app.schemas.common import PaginatedResponse
+from backend.app.schemas.instrument import InstrumentCreate, InstrumentSort, InstrumentUpdate, InstrumentResponse
+from backend.app.schemas.common import BulkDeleteRequest, BulkDeleteResult, ImportResult, PaginatedResponse
+from backend.app.data.pagination import TotalMode, build_batch, build_page, parse_ids
+from backend.app.utils.bulk_import import ImportFormat, detect_format, import_upload
+from backend.app.utils.export import ExportFormat, export_response
+from backend.app.utils.conditional import conditional
+from backend.app.utils.serialization import json_page, serializer
 from backend.app.utils.security import get_current_user
 
+_serialize = serializer(instrument_requests.READ_COLUMNS)
+
 router = APIRouter(prefix="/api/instruments", tags=["Инструменты"])
 
 
-@router.get("", response_model=PaginatedResponse[InstrumentResponse])
+@router.get("", response_model=PaginatedResponse[InstrumentResponse],
+            dependencies=[Depends(conditional("instruments"))])
 async def get_instruments(
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[User, Depends(get_current_user)], response: Response,
     page: int = Query(1, ge=1), per_page: int = Query(10, ge=1, le=100),
-    search: str | None = Query(None)
+    search: str | None = Query(None), sort: InstrumentSort | None = Query(None), cursor: str | None = Query(None),
+    total: TotalMode = Query("exact"),
+    ids: str | None = Query(None, description="Comma-separated ids; returns just those records")
 ):
-    items, total = await instrument_requests.get_list(page=page, per_page=per_page, search=search)
-    return {"items": items, "total": total, "page": page, "per_page": per_page,
-            "pages": math.ceil(total / per_page) if total > 0 else 1}
+    if ids is not None:
+        try:
+            requested = parse_ids(ids)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        items = [i for i in await instrument_requests.loader.load_many(requested) if i is not None]
+        return json_page(build_batch(items), _serialize, response)
+    try:
+        result = await instrument_requests.get_list(
+            page=page, per_page=per_page, search=search, sort=sort, cursor=cursor, total=total
+        )
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return json_page(build_page(result, page, per_page, cursor), _serialize, response)
+
+
+@router.get("/export")
+async def export_instruments(current_user: Annotated[User, Depends(get_current_user)],
+                             format: ExportFormat = Query("csv")):
+    return export_response(instrument_requests.export_query(), instrument_requests, format, "instruments")
+
 
+@router.post("/bulk-delete", response_model=BulkDeleteResult)
+async def delete_instruments(data: BulkDeleteRequest, current_user: Annotated[User, Depends(get_current_user)]):
+    return {"deleted": await instrument_requests.delete_many(data.ids)}
 
-@router.get("/{instrument_id}", response_model=InstrumentResponse)
+
+@router.get("/{instrument_id}", response_model=InstrumentResponse,
+            dependencies=[Depends(conditional("instruments"))])
 async def get_instrument(instrument_id: int, current_user: Annotated[User, Depends(get_current_user)]):
     instrument = await instrument_requests.get_by_id(instrument_id)
     if not instrument:
@@ -37,6 +69,12 @@ async def create_instrument(instrument_data: InstrumentCreate, current_user: Ann
     )
 
 
+@router.post("/import", response_model=ImportResult)
+async def import_instruments(current_user: Annotated[User, Depends(get_current_user)],
+                             file: UploadFile = File(...), format: ImportFormat | None = Query(None)):
+    return await import_upload(file, detect_format(file, format), InstrumentCreate, instrument_requests)
+
+
 @router.put("/{instrument_id}", response_model=InstrumentResponse)
 async def update_instrument(instrument_id: int, instrument_data: InstrumentUpdate,
                             current_user: Annotated[User, Depends(get_current_user)]):
@@ -1,39 +1,106 @@
-import math
+from datetime import time
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from backend.app.data.models import User
-from backend.app.data.db_requests.schedule import schedule_requests
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from backend.app.data.models import User, WEEKDAYS
+from backend.app.data.occupancy import occupancy
+from backend.app.data.db_requests.schedule import ScheduleConflictError, schedule_requests
 from backend.app.data.db_requests.students import student_requests
 from backend.app.data.db_requests.teachers import teacher_requests
-from backend.app.schemas.schedule import ScheduleCreate, ScheduleUpdate, ScheduleResponse
-from backend.app.schemas.common import PaginatedResponse
+from backend.app.schemas.schedule import (
+    AvailabilitySlot, ScheduleCreate, ScheduleSort, ScheduleUpdate, ScheduleResponse, Timetable, Weekday
+)
+from backend.app.schemas.common import BulkDeleteRequest, BulkDeleteResult, PaginatedResponse
+from backend.app.data.pagination import TotalMode, build_batch, build_page, parse_ids
+from backend.app.utils.export import ExportFormat, export_response
+from backend.app.utils.conditional import conditional
+from backend.app.utils.serialization import json_page, serializer
 from backend.app.utils.security import get_current_user
 
+_serialize = serializer((*schedule_requests.READ_COLUMNS, "student_name", "teacher_name"))
+
 router = APIRouter(prefix="/api/schedule", tags=["Расписание"])
 
 
 def _build_response(s):
-    return {
-        "id": s.id, "student_id": s.student_id, "teacher_id": s.teacher_id,
-        "student_name": f"{s.student.first_name} {s.student.last_name}" if s.student else None,
-        "teacher_name": f"{s.teacher.first_name} {s.teacher.last_name}" if s.teacher else None,
-        "day_of_week": s.day_of_week, "start_time": s.start_time, "end_time": s.end_time,
-        "room": s.room, "created_at": s.created_at
-    }
+    # Reads and writes both return rows carrying the participants' names.
+    return s._asdict()
+
+
+async def _check_participants(student_id: int | None, teacher_id: int | None) -> None:
+    # In the request transaction, which runs one statement at a time, so not gathered.
+    for requests, entity_id, detail in ((student_requests, student_id, "Student not found"),
+                                        (teacher_requests, teacher_id, "Teacher not found")):
+        if entity_id is not None and not await requests.get_by_id(entity_id):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
 
+def _conflict_exception(error: ScheduleConflictError) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail=jsonable_encoder({
+        "message": str(error),
+        "conflicts": [{"conflicts_on": on, "entry": _build_response(entry)} for entry, on in error.conflicts],
+    }))
 
-@router.get("", response_model=PaginatedResponse[ScheduleResponse])
+
+@router.get("", response_model=PaginatedResponse[ScheduleResponse],
+            dependencies=[Depends(conditional("schedule", "students", "teachers"))])
 async def get_schedule_list(
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[User, Depends(get_current_user)], response: Response,
     page: int = Query(1, ge=1), per_page: int = Query(10, ge=1, le=100),
-    search: str | None = Query(None)
+    search: str | None = Query(None), sort: ScheduleSort | None = Query(None), cursor: str | None = Query(None),
+    total: TotalMode = Query("exact"),
+    ids: str | None = Query(None, description="Comma-separated ids; returns just those records")
+):
+    if ids is not None:
+        try:
+            requested = parse_ids(ids)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        items = [i for i in await schedule_requests.loader.load_many(requested) if i is not None]
+        return json_page(build_batch(items), _serialize, response)
+    try:
+        result = await schedule_requests.get_list(
+            page=page, per_page=per_page, search=search, sort=sort, cursor=cursor, total=total
+        )
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return json_page(build_page(result, page, per_page, cursor), _serialize, response)
+
+
+@router.get("/availability", response_model=list[AvailabilitySlot])
+async def get_availability(
+    current_user: Annotated[User, Depends(get_current_user)],
+    duration: int = Query(..., ge=5, le=12 * 60, description="Minutes"),
+    day: list[Weekday] | None = Query(None), teacher_id: int | None = Query(None),
+    student_id: int | None = Query(None), room: list[str] | None = Query(None),
+    all_rooms: bool = Query(False), work_start: time = Query(time(9)), work_end: time = Query(time(21))
 ):
-    items, total = await schedule_requests.get_list(page=page, per_page=per_page, search=search)
-    return {"items": [_build_response(i) for i in items], "total": total, "page": page,
-            "per_page": per_page, "pages": math.ceil(total / per_page) if total > 0 else 1}
+    if work_end <= work_start:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="work_end must be after work_start")
+    await occupancy.ensure_fresh()
+    rooms = occupancy.rooms() if all_rooms else room
+    return occupancy.free_intervals(duration, day or list(WEEKDAYS), work_start, work_end,
+                                    teacher_id=teacher_id, student_id=student_id, rooms=rooms)
+
+
+@router.get("/rooms/{room}/timetable", response_model=Timetable)
+async def get_room_timetable(room: str, current_user: Annotated[User, Depends(get_current_user)]):
+    return {"days": await schedule_requests.get_timetable("room", room)}
+
+
+@router.get("/export")
+async def export_schedule(current_user: Annotated[User, Depends(get_current_user)],
+                          format: ExportFormat = Query("csv")):
+    return export_response(schedule_requests.export_query(), schedule_requests, format, "schedule")
+
+
+@router.post("/bulk-delete", response_model=BulkDeleteResult)
+async def delete_schedule_entries(data: BulkDeleteRequest, current_user: Annotated[User, Depends(get_current_user)]):
+    return {"deleted": await schedule_requests.delete_many(data.ids)}
 
 
-@router.get("/{schedule_id}", response_model=ScheduleResponse)
+@router.get("/{schedule_id}", response_model=ScheduleResponse,
+            dependencies=[Depends(conditional("schedule", "students", "teachers"))])
 async def get_schedule(schedule_id: int, current_user: Annotated[User, Depends(get_current_user)]):
     schedule = await schedule_requests.get_by_id(schedule_id)
     if not schedule:
@@ -41,32 +108,36 @@ async def get_schedule(schedule_id: int, current_user: Annotated[User, Depends(g
     return _build_response(schedule)
 
 
-@router.post("", response_model=ScheduleResponse, status_code=status.HTTP_201_CREATED)
+@router.post("", response_model=ScheduleResponse, status_code=status.HTTP_201_CREATED,
+             responses={status.HTTP_409_CONFLICT: {"description": "Overlaps existing lessons"}})
 async def create_schedule(schedule_data: ScheduleCreate, current_user: Annotated[User, Depends(get_current_user)]):
-    if not await student_requests.get_by_id(schedule_data.student_id):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Student not found")
-    if not await teacher_requests.get_by_id(schedule_data.teacher_id):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Teacher not found")
-    schedule = await schedule_requests.create(
-        student_id=schedule_data.student_id, teacher_id=schedule_data.teacher_id,
-        day_of_week=schedule_data.day_of_week, start_time=schedule_data.start_time,
-        end_time=schedule_data.end_time, room=schedule_data.room
-    )
+    await _check_participants(schedule_data.student_id, schedule_data.teacher_id)
+    try:
+        schedule = await schedule_requests.create(
+            student_id=schedule_data.student_id, teacher_id=schedule_data.teacher_id,
+            day_of_week=schedule_data.day_of_week, start_time=schedule_data.start_time,
+            end_time=schedule_data.end_time, room=schedule_data.room
+        )
+    except ScheduleConflictError as e:
+        raise _conflict_exception(e)
     return _build_response(schedule)
 
 
-@router.put("/{schedule_id}", response_model=ScheduleResponse)
+@router.put("/{schedule_id}", response_model=ScheduleResponse,
+            responses={status.HTTP_409_CONFLICT: {"description": "Overlaps existing lessons"}})
 async def update_schedule(schedule_id: int, schedule_data: ScheduleUpdate,
                           current_user: Annotated[User, Depends(get_current_user)]):
-    if schedule_data.student_id and not await student_requests.get_by_id(schedule_data.student_id):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Student not found")
-    if schedule_data.teacher_id and not await teacher_requests.get_by_id(schedule_data.teacher_id):
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Teacher not found")
-    schedule = await schedule_requests.update(
-        schedule_id=schedule_id, student_id=schedule_data.student_id, teacher_id=schedule_data.teacher_id,
-        day_of_week=schedule_data.day_of_week, start_time=schedule_data.start_time,
-        end_time=schedule_data.end_time, room=schedule_data.room
-    )
+    await _check_participants(schedule_data.student_id, schedule_data.teacher_id)
+    try:
+        schedule = await schedule_requests.update(
+            schedule_id=schedule_id, student_id=schedule_data.student_id, teacher_id=schedule_data.teacher_id,
+            day_of_week=schedule_data.day_of_week, start_time=schedule_data.start_time,
+            end_time=schedule_data.end_time, room=schedule_data.room
+        )
+    except ScheduleConflictError as e:
+        raise _conflict_exception(e)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     if not schedule:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Schedule not found")
     return _build_response(schedule)
@@ -1,27 +1,62 @@
-import math
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
 from backend.app.data.models import User
+from backend.app.data.db_requests.base import DuplicateError
+from backend.app.data.db_requests.schedule import schedule_requests
 from backend.app.data.db_requests.students import student_requests
-from backend.app.schemas.student import StudentCreate, StudentUpdate, StudentResponse
-from backend.app.schemas.common import PaginatedResponse
+from backend.app.schemas.student import StudentCreate, StudentSort, StudentUpdate, StudentResponse
+from backend.app.schemas.schedule import Timetable
+from backend.app.schemas.common import BulkDeleteRequest, BulkDeleteResult, ImportResult, PaginatedResponse
+from backend.app.data.pagination import TotalMode, build_batch, build_page, parse_ids
+from backend.app.utils.bulk_import import ImportFormat, detect_format, import_upload
+from backend.app.utils.export import ExportFormat, export_response
+from backend.app.utils.conditional import conditional
+from backend.app.utils.serialization import json_page, serializer
 from backend.app.utils.security import get_current_user
 
+_serialize = serializer(student_requests.READ_COLUMNS)
+
 router = APIRouter(prefix="/api/students", tags=["Ученики"])
 
 
-@router.get("", response_model=PaginatedResponse[StudentResponse])
+@router.get("", response_model=PaginatedResponse[StudentResponse],
+            dependencies=[Depends(conditional("students"))])
 async def get_students(
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[User, Depends(get_current_user)], response: Response,
     page: int = Query(1, ge=1), per_page: int = Query(10, ge=1, le=100),
-    search: str | None = Query(None)
+    search: str | None = Query(None), sort: StudentSort | None = Query(None), cursor: str | None = Query(None),
+    total: TotalMode = Query("exact"),
+    ids: str | None = Query(None, description="Comma-separated ids; returns just those records")
 ):
-    items, total = await student_requests.get_list(page=page, per_page=per_page, search=search)
-    return {"items": items, "total": total, "page": page, "per_page": per_page,
-            "pages": math.ceil(total / per_page) if total > 0 else 1}
+    if ids is not None:
+        try:
+            requested = parse_ids(ids)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        items = [i for i in await student_requests.loader.load_many(requested) if i is not None]
+        return json_page(build_batch(items), _serialize, response)
+    try:
+        result = await student_requests.get_list(
+            page=page, per_page=per_page, search=search, sort=sort, cursor=cursor, total=total
+        )
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return json_page(build_page(result, page, per_page, cursor), _serialize, response)
+
+
+@router.get("/export")
+async def export_students(current_user: Annotated[User, Depends(get_current_user)],
+                          format: ExportFormat = Query("csv")):
+    return export_response(student_requests.export_query(), student_requests, format, "students")
 
 
-@router.get("/{student_id}", response_model=StudentResponse)
+@router.post("/bulk-delete", response_model=BulkDeleteResult)
+async def delete_students(data: BulkDeleteRequest, current_user: Annotated[User, Depends(get_current_user)]):
+    return {"deleted": await student_requests.delete_many(data.ids)}
+
+
+@router.get("/{student_id}", response_model=StudentResponse,
+            dependencies=[Depends(conditional("students"))])
 async def get_student(student_id: int, current_user: Annotated[User, Depends(get_current_user)]):
     student = await student_requests.get_by_id(student_id)
     if not student:
@@ -29,27 +64,42 @@ async def get_student(student_id: int, current_user: Annotated[User, Depends(get
     return student
 
 
+@router.get("/{student_id}/timetable", response_model=Timetable)
+async def get_student_timetable(student_id: int, current_user: Annotated[User, Depends(get_current_user)]):
+    days = await schedule_requests.get_timetable("student", student_id)
+    # A lesson implies the student exists, so only an empty week needs the lookup.
+    if not any(day["lessons"] for day in days) and not await student_requests.get_by_id(student_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
+    return {"days": days}
+
+
 @router.post("", response_model=StudentResponse, status_code=status.HTTP_201_CREATED)
 async def create_student(student_data: StudentCreate, current_user: Annotated[User, Depends(get_current_user)]):
-    if await student_requests.get_by_email(student_data.email):
+    try:
+        return await student_requests.create(
+            first_name=student_data.first_name, last_name=student_data.last_name,
+            email=student_data.email, phone=student_data.phone, birth_date=student_data.birth_date
+        )
+    except DuplicateError:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exists")
-    return await student_requests.create(
-        first_name=student_data.first_name, last_name=student_data.last_name,
-        email=student_data.email, phone=student_data.phone, birth_date=student_data.birth_date
-    )
+
+
+@router.post("/import", response_model=ImportResult)
+async def import_students(current_user: Annotated[User, Depends(get_current_user)],
+                          file: UploadFile = File(...), format: ImportFormat | None = Query(None)):
+    return await import_upload(file, detect_format(file, format), StudentCreate, student_requests)
 
 
 @router.put("/{student_id}", response_model=StudentResponse)
 async def update_student(student_id: int, student_data: StudentUpdate,
                          current_user: Annotated[User, Depends(get_current_user)]):
-    if student_data.email:
-        existing = await student_requests.get_by_email(student_data.email)
-        if existing and existing.id != student_id:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exists")
-    student = await student_requests.update(
-        student_id=student_id, first_name=student_data.first_name, last_name=student_data.last_name,
-        email=student_data.email, phone=student_data.phone, birth_date=student_data.birth_date
-    )
+    try:
+        student = await student_requests.update(
+            student_id=student_id, first_name=student_data.first_name, last_name=student_data.last_name,
+            email=student_data.email, phone=student_data.phone, birth_date=student_data.birth_date
+        )
+    except DuplicateError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exists")
     if not student:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Student not found")
     return student
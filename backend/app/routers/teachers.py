@@ -1,27 +1,62 @@
-import math
 from typing import Annotated
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
 from backend.app.data.models import User
+from backend.app.data.db_requests.base import DuplicateError
+from backend.app.data.db_requests.schedule import schedule_requests
 from backend.app.data.db_requests.teachers import teacher_requests
-from backend.app.schemas.teacher import TeacherCreate, TeacherUpdate, TeacherResponse
-from backend.app.schemas.common import PaginatedResponse
+from backend.app.schemas.teacher import TeacherCreate, TeacherSort, TeacherUpdate, TeacherResponse
+from backend.app.schemas.schedule import Timetable
+from backend.app.schemas.common import BulkDeleteRequest, BulkDeleteResult, ImportResult, PaginatedResponse
+from backend.app.data.pagination import TotalMode, build_batch, build_page, parse_ids
+from backend.app.utils.bulk_import import ImportFormat, detect_format, import_upload
+from backend.app.utils.export import ExportFormat, export_response
+from backend.app.utils.conditional import conditional
+from backend.app.utils.serialization import json_page, serializer
 from backend.app.utils.security import get_current_user
 
+_serialize = serializer(teacher_requests.READ_COLUMNS)
+
 router = APIRouter(prefix="/api/teachers", tags=["Преподаватели"])
 
 
-@router.get("", response_model=PaginatedResponse[TeacherResponse])
+@router.get("", response_model=PaginatedResponse[TeacherResponse],
+            dependencies=[Depends(conditional("teachers"))])
 async def get_teachers(
-    current_user: Annotated[User, Depends(get_current_user)],
+    current_user: Annotated[User, Depends(get_current_user)], response: Response,
     page: int = Query(1, ge=1), per_page: int = Query(10, ge=1, le=100),
-    search: str | None = Query(None)
+    search: str | None = Query(None), sort: TeacherSort | None = Query(None), cursor: str | None = Query(None),
+    total: TotalMode = Query("exact"),
+    ids: str | None = Query(None, description="Comma-separated ids; returns just those records")
 ):
-    items, total = await teacher_requests.get_list(page=page, per_page=per_page, search=search)
-    return {"items": items, "total": total, "page": page, "per_page": per_page,
-            "pages": math.ceil(total / per_page) if total > 0 else 1}
+    if ids is not None:
+        try:
+            requested = parse_ids(ids)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        items = [i for i in await teacher_requests.loader.load_many(requested) if i is not None]
+        return json_page(build_batch(items), _serialize, response)
+    try:
+        result = await teacher_requests.get_list(
+            page=page, per_page=per_page, search=search, sort=sort, cursor=cursor, total=total
+        )
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return json_page(build_page(result, page, per_page, cursor), _serialize, response)
+
+
+@router.get("/export")
+async def export_teachers(current_user: Annotated[User, Depends(get_current_user)],
+                          format: ExportFormat = Query("csv")):
+    return export_response(teacher_requests.export_query(), teacher_requests, format, "teachers")
 
 
-@router.get("/{teacher_id}", response_model=TeacherResponse)
+@router.post("/bulk-delete", response_model=BulkDeleteResult)
+async def delete_teachers(data: BulkDeleteRequest, current_user: Annotated[User, Depends(get_current_user)]):
+    return {"deleted": await teacher_requests.delete_many(data.ids)}
+
+
+@router.get("/{teacher_id}", response_model=TeacherResponse,
+            dependencies=[Depends(conditional("teachers"))])
 async def get_teacher(teacher_id: int, current_user: Annotated[User, Depends(get_current_user)]):
     teacher = await teacher_requests.get_by_id(teacher_id)
     if not teacher:
@@ -29,27 +64,42 @@ async def get_teacher(teacher_id: int, current_user: Annotated[User, Depends(get
     return teacher
 
 
+@router.get("/{teacher_id}/timetable", response_model=Timetable)
+async def get_teacher_timetable(teacher_id: int, current_user: Annotated[User, Depends(get_current_user)]):
+    days = await schedule_requests.get_timetable("teacher", teacher_id)
+    # A lesson implies the teacher exists, so only an empty week needs the lookup.
+    if not any(day["lessons"] for day in days) and not await teacher_requests.get_by_id(teacher_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Teacher not found")
+    return {"days": days}
+
+
 @router.post("", response_model=TeacherResponse, status_code=status.HTTP_201_CREATED)
 async def create_teacher(teacher_data: TeacherCreate, current_user: Annotated[User, Depends(get_current_user)]):
-    if await teacher_requests.get_by_email(teacher_data.email):
+    try:
+        return await teacher_requests.create(
+            first_name=teacher_data.first_name, last_name=teacher_data.last_name,
+            email=teacher_data.email, phone=teacher_data.phone, specialization=teacher_data.specialization
+        )
+    except DuplicateError:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exists")
-    return await teacher_requests.create(
-        first_name=teacher_data.first_name, last_name=teacher_data.last_name,
-        email=teacher_data.email, phone=teacher_data.phone, specialization=teacher_data.specialization
-    )
+
+
+@router.post("/import", response_model=ImportResult)
+async def import_teachers(current_user: Annotated[User, Depends(get_current_user)],
+                          file: UploadFile = File(...), format: ImportFormat | None = Query(None)):
+    return await import_upload(file, detect_format(file, format), TeacherCreate, teacher_requests)
 
 
 @router.put("/{teacher_id}", response_model=TeacherResponse)
 async def update_teacher(teacher_id: int, teacher_data: TeacherUpdate,
                          current_user: Annotated[User, Depends(get_current_user)]):
-    if teacher_data.email:
-        existing = await teacher_requests.get_by_email(teacher_data.email)
-        if existing and existing.id != teacher_id:
-            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exists")
-    teacher = await teacher_requests.update(
-        teacher_id=teacher_id, first_name=teacher_data.first_name, last_name=teacher_data.last_name,
-        email=teacher_data.email, phone=teacher_data.phone, specialization=teacher_data.specialization
-    )
+    try:
+        teacher = await teacher_requests.update(
+            teacher_id=teacher_id, first_name=teacher_data.first_name, last_name=teacher_data.last_name,
+            email=teacher_data.email, phone=teacher_data.phone, specialization=teacher_data.specialization
+        )
+    except DuplicateError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already exists")
     if not teacher:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Teacher not found")
     return teacher
@@ -1,6 +1,12 @@
 # Pydantic schemas module
 
-from backend.app.schemas.common import PaginatedResponse
+from backend.app.schemas.common import (
+    BulkDeleteRequest,
+    BulkDeleteResult,
+    ImportResult,
+    ImportRowError,
+    PaginatedResponse,
+)
 from backend.app.schemas.instrument import (
     InstrumentCreate,
     InstrumentResponse,
@@ -10,6 +16,8 @@ from backend.app.schemas.schedule import (
     ScheduleCreate,
     ScheduleResponse,
     ScheduleUpdate,
+    Timetable,
+    TimetableDay,
 )
 from backend.app.schemas.student import StudentCreate, StudentResponse, StudentUpdate
 from backend.app.schemas.teacher import TeacherCreate, TeacherResponse, TeacherUpdate
@@ -37,6 +45,12 @@ __all__ = [
     "ScheduleCreate",
     "ScheduleUpdate",
     "ScheduleResponse",
+    "Timetable",
+    "TimetableDay",
     # Common
     "PaginatedResponse",
+    "ImportResult",
+    "ImportRowError",
+    "BulkDeleteRequest",
+    "BulkDeleteResult",
 ]
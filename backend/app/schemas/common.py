@@ -1,12 +1,33 @@
 from typing import Generic, TypeVar
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 T = TypeVar("T")
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
     items: list[T]
-    total: int
-    page: int
+    total: int | None
+    page: int | None
     per_page: int
-    pages: int
+    pages: int | None
+    has_more: bool = False
+    next_cursor: str | None = None
+
+
+class ImportRowError(BaseModel):
+    row: int
+    errors: list[str]
+
+
+class ImportResult(BaseModel):
+    inserted: int
+    failed: int
+    errors: list[ImportRowError]
+
+
+class BulkDeleteRequest(BaseModel):
+    ids: list[int] = Field(min_length=1, max_length=10000)
+
+
+class BulkDeleteResult(BaseModel):
+    deleted: list[int]
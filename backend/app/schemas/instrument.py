@@ -1,6 +1,9 @@
 from datetime import datetime
+from typing import Literal
 from pydantic import BaseModel, Field
 
+InstrumentSort = Literal["id", "relevance", "name", "type", "created_at"]
+
 
 class InstrumentCreate(BaseModel):
     name: str = Field(min_length=2, max_length=100)
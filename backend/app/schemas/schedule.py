@@ -1,24 +1,42 @@
 from datetime import datetime, time
-from pydantic import BaseModel, Field
+from typing import Annotated, Literal
+from pydantic import BaseModel, BeforeValidator, Field, model_validator
+from backend.app.data.models import WEEKDAYS, weekday_ordinal
+
+ScheduleSort = Literal["id", "relevance", "start_time", "room", "created_at"]
+# Accepts the day name in any case or its ISO number (1 = Monday); always the name on the way out.
+Weekday = Annotated[str, BeforeValidator(lambda value: WEEKDAYS[weekday_ordinal(value) - 1])]
 
 
 class ScheduleCreate(BaseModel):
     student_id: int
     teacher_id: int
-    day_of_week: str = Field(min_length=2, max_length=20)
+    day_of_week: Weekday
     start_time: time
     end_time: time
     room: str = Field(min_length=1, max_length=50)
 
+    @model_validator(mode="after")
+    def check_time_order(self):
+        if self.end_time <= self.start_time:
+            raise ValueError("end_time must be after start_time")
+        return self
+
 
 class ScheduleUpdate(BaseModel):
     student_id: int | None = None
     teacher_id: int | None = None
-    day_of_week: str | None = Field(None, min_length=2, max_length=20)
+    day_of_week: Weekday | None = None
     start_time: time | None = None
     end_time: time | None = None
     room: str | None = Field(None, min_length=1, max_length=50)
 
+    @model_validator(mode="after")
+    def check_time_order(self):
+        if self.start_time is not None and self.end_time is not None and self.end_time <= self.start_time:
+            raise ValueError("end_time must be after start_time")
+        return self
+
 
 class ScheduleResponse(BaseModel):
     id: int
@@ -32,3 +50,19 @@ class ScheduleResponse(BaseModel):
     room: str
     created_at: datetime
     model_config = {"from_attributes": True}
+
+
+class TimetableDay(BaseModel):
+    day_of_week: str
+    lessons: list[ScheduleResponse]
+
+
+class Timetable(BaseModel):
+    days: list[TimetableDay]
+
+
+class AvailabilitySlot(BaseModel):
+    day_of_week: str
+    room: str | None = None
+    start_time: time
+    end_time: time
@@ -1,6 +1,9 @@
 from datetime import date, datetime
+from typing import Literal
 from pydantic import BaseModel, EmailStr, Field
 
+StudentSort = Literal["id", "relevance", "last_name", "created_at"]
+
 
 class StudentCreate(BaseModel):
     first_name: str = Field(min_length=2, max_length=100)
@@ -1,6 +1,9 @@
 from datetime import datetime
+from typing import Literal
 from pydantic import BaseModel, EmailStr, Field
 
+TeacherSort = Literal["id", "relevance", "last_name", "specialization", "created_at"]
+
 
 class TeacherCreate(BaseModel):
     first_name: str = Field(min_length=2, max_length=100)
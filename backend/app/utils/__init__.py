@@ -4,6 +4,8 @@ from backend.app.utils.security import (
     hash_password,
     verify_password,
     create_access_token,
+    create_user_token,
     decode_access_token,
+    verify_access_token,
     get_current_user,
 )
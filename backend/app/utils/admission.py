@@ -0,0 +1,109 @@
+import asyncio
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from backend.app.config import settings
+from backend.app.data.db import statement_timeout_ms
+
+BULK_ACTIONS = ("export", "import", "bulk-delete")
+
+
+def route_group(method: str, path: str) -> str | None:
+    """Admission group of an API request, decided from the path before routing; None bypasses admission."""
+    if method == "OPTIONS" or not path.startswith("/api/"):
+        return None
+    if path.startswith("/api/auth"):
+        return "auth"
+    last = path.rstrip("/").rsplit("/", 1)[-1]
+    if last in BULK_ACTIONS:
+        return "bulk"
+    if method in ("GET", "HEAD"):
+        return "detail" if last.isdigit() else "read"
+    return "write"
+
+
+class _Gate:
+    """At most ``limit`` requests inside and ``queue_size`` waiting, each for at most ``timeout`` seconds."""
+
+    __slots__ = ("limit", "queue_size", "timeout", "semaphore", "waiting", "shed")
+
+    def __init__(self, limit: int, queue_size: int, timeout: float):
+        self.limit, self.queue_size, self.timeout = limit, queue_size, timeout
+        self.semaphore = asyncio.Semaphore(limit)
+        self.waiting = 0
+        self.shed = 0
+
+    async def acquire(self) -> bool:
+        if not self.semaphore.locked():
+            await self.semaphore.acquire()
+            return True
+        if self.waiting >= self.queue_size:
+            return False
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), self.timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.waiting -= 1
+
+    def release(self) -> None:
+        self.semaphore.release()
+
+    def status(self) -> dict:
+        return {"limit": self.limit, "in_use": self.limit - self.semaphore._value,
+                "waiting": self.waiting, "shed": self.shed}
+
+
+def _gates() -> dict[str, _Gate]:
+    limits = {
+        "auth": settings.ADMISSION_AUTH_LIMIT, "detail": settings.ADMISSION_DETAIL_LIMIT,
+        "read": settings.ADMISSION_READ_LIMIT, "write": settings.ADMISSION_WRITE_LIMIT,
+        "bulk": settings.ADMISSION_BULK_LIMIT,
+    }
+    return {group: _Gate(limit, settings.ADMISSION_QUEUE_SIZE, settings.ADMISSION_QUEUE_TIMEOUT)
+            for group, limit in limits.items()}
+
+
+STATEMENT_TIMEOUTS = {
+    "auth": settings.STATEMENT_TIMEOUT_AUTH_MS, "detail": settings.STATEMENT_TIMEOUT_DETAIL_MS,
+    "read": settings.STATEMENT_TIMEOUT_READ_MS, "write": settings.STATEMENT_TIMEOUT_WRITE_MS,
+    "bulk": settings.STATEMENT_TIMEOUT_BULK_MS,
+}
+gates = _gates()
+
+
+def admission_status() -> dict:
+    return {group: gate.status() for group, gate in gates.items()}
+
+
+def overloaded_response(detail: str) -> JSONResponse:
+    return JSONResponse({"detail": detail}, status_code=503,
+                        headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)})
+
+
+class AdmissionMiddleware:
+    """Caps concurrent API requests per route group and sheds the excess with 503 + Retry-After."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        group = route_group(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if group is None:
+            await self.app(scope, receive, send)
+            return
+        timeout = STATEMENT_TIMEOUTS[group]
+        statement_timeout_ms.set(timeout if timeout > 0 else None)
+        if not settings.ADMISSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        gate = gates[group]
+        if not await gate.acquire():
+            gate.shed += 1
+            await overloaded_response("Сервер перегружен, повторите запрос позже")(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+from itertools import islice
+from typing import Literal
+from fastapi import UploadFile
+from pydantic import BaseModel, ValidationError
+from starlette.concurrency import run_in_threadpool
+from backend.app.config import settings
+
+ImportFormat = Literal["csv", "ndjson"]
+
+
+def detect_format(upload: UploadFile, requested: ImportFormat | None) -> ImportFormat:
+    if requested:
+        return requested
+    name = (upload.filename or "").lower()
+    if "json" in (upload.content_type or "") or name.endswith((".ndjson", ".jsonl")):
+        return "ndjson"
+    return "csv"
+
+
+def _iter_records(upload: UploadFile, fmt: ImportFormat):
+    """Yield (line number, raw record or parse error) without reading the whole file."""
+    upload.file.seek(0)
+    text = io.TextIOWrapper(upload.file, encoding="utf-8-sig", errors="replace", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for record in reader:
+            yield reader.line_num, record
+        return
+    for line_no, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line)
+        except ValueError as e:
+            yield line_no, e
+
+
+def _format_errors(error: ValidationError | ValueError) -> list[str]:
+    if isinstance(error, ValidationError):
+        return [f"{'.'.join(str(p) for p in e['loc']) or 'row'}: {e['msg']}" for e in error.errors()]
+    return [f"row: {error}"]
+
+
+async def import_upload(upload: UploadFile, fmt: ImportFormat, schema: type[BaseModel], requests) -> dict:
+    """Validate and insert an uploaded file ``IMPORT_CHUNK_SIZE`` rows at a time, committing after each chunk."""
+    records = _iter_records(upload, fmt)
+    unique = requests.UNIQUE_COLUMN
+    inserted = failed = 0
+    errors = []
+
+    def fail(row: int, messages: list[str]):
+        nonlocal failed
+        failed += 1
+        if len(errors) < settings.IMPORT_MAX_ERRORS:
+            errors.append({"row": row, "errors": messages})
+
+    async with requests.bulk_connection() as conn:
+        while chunk := await run_in_threadpool(lambda: list(islice(records, settings.IMPORT_CHUNK_SIZE))):
+            valid, keys = [], {}
+            for row, record in chunk:
+                try:
+                    if isinstance(record, Exception):
+                        raise record
+                    data = schema.model_validate(record).model_dump()
+                except (ValidationError, ValueError) as e:
+                    fail(row, _format_errors(e))
+                    continue
+                if unique:
+                    if data[unique] in keys:
+                        fail(row, [f"{unique}: duplicate of row {keys[data[unique]]}"])
+                        continue
+                    keys[data[unique]] = row
+                valid.append((row, data))
+            if not valid:
+                continue
+            stored = await requests.bulk_insert(conn, [data for _, data in valid])
+            await conn.commit()
+            for row, data in valid:
+                if stored is None or data[unique] in stored:
+                    inserted += 1
+                else:
+                    fail(row, [f"{unique}: already exists"])
+    return {"inserted": inserted, "failed": failed, "errors": sorted(errors, key=lambda e: e["row"])}
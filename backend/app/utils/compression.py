@@ -0,0 +1,44 @@
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, IdentityResponder
+from starlette.types import Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; without it only gzip is offered
+    brotli = None
+
+
+class BrotliResponder(IdentityResponder):
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size: int, quality: int, **kwargs):
+        super().__init__(app, minimum_size, **kwargs)
+        self.quality = quality
+        self._compressor = None
+
+    async def apply_compression(self, body: bytes, *, more_body: bool) -> bytes:
+        if self._compressor is None:
+            self._compressor = brotli.Compressor(quality=self.quality)
+        data = self._compressor.process(body)
+        return data + (self._compressor.flush() if more_body else self._compressor.finish())
+
+
+def _accepted_encodings(scope: Scope) -> set[str]:
+    header = Headers(scope=scope).get("accept-encoding", "")
+    return {part.split(";")[0].strip().lower() for part in header.split(",")}
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """GZip middleware that prefers Brotli when the client accepts it and the module is installed."""
+
+    def __init__(self, app, minimum_size: int = 1024, compresslevel: int = 6, brotli_quality: int = 4):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and brotli is not None and "br" in _accepted_encodings(scope):
+            responder = BrotliResponder(self.app, self.minimum_size, self.brotli_quality,
+                                        exclude_content_types=self.exclude_content_types)
+            await responder(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
@@ -0,0 +1,43 @@
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Annotated
+from fastapi import Depends, HTTPException, Request, Response, status
+from backend.app.data.models import User
+from backend.app.data.versions import table_stamp
+from backend.app.utils.security import get_current_user
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored on both sides.
+    tags = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
+
+
+def _not_modified_since(header: str, changed_at: datetime | None) -> bool:
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    return changed_at is not None and changed_at.replace(microsecond=0) <= since
+
+
+def conditional(*tables: str):
+    """Dependency that answers 304 from the tables' version stamps before the endpoint runs its queries."""
+    async def check(request: Request, response: Response,
+                    current_user: Annotated[User, Depends(get_current_user)]) -> None:
+        version, changed_at = await table_stamp(tables)
+        stamp = int(changed_at.timestamp() * 1_000_000) if changed_at else 0
+        headers = {"ETag": f'W/"{version:x}-{stamp:x}"', "Cache-Control": "private, no-cache"}
+        if changed_at is not None:
+            headers["Last-Modified"] = format_datetime(changed_at, usegmt=True)
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            not_modified = _etag_matches(if_none_match, headers["ETag"])
+        else:
+            not_modified = _not_modified_since(request.headers.get("if-modified-since", ""), changed_at)
+        if not_modified:
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+
+    return check
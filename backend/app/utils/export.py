@@ -0,0 +1,48 @@
+import csv
+import io
+import json
+from datetime import date, datetime, time
+from typing import AsyncIterator, Literal
+from fastapi.responses import StreamingResponse
+
+ExportFormat = Literal["csv", "ndjson"]
+MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _drain(buffer: io.StringIO) -> bytes:
+    data = buffer.getvalue().encode("utf-8")
+    buffer.seek(0)
+    buffer.truncate()
+    return data
+
+
+async def _encode(batches: AsyncIterator[list], columns: list[str], fmt: ExportFormat) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == "csv":
+        # The header goes out before the query runs, so the client sees a first byte immediately.
+        writer.writerow(columns)
+        yield _drain(buffer)
+    async for rows in batches:
+        if fmt == "csv":
+            writer.writerows(rows)
+        else:
+            for row in rows:
+                buffer.write(json.dumps(dict(zip(columns, row)), default=_json_default, ensure_ascii=False))
+                buffer.write("\n")
+        yield _drain(buffer)
+
+
+def export_response(query, requests, fmt: ExportFormat, filename: str) -> StreamingResponse:
+    """Stream ``query`` from a server-side cursor; one encoded chunk per fetched batch."""
+    columns = [c.key for c in query.selected_columns]
+    return StreamingResponse(
+        _encode(requests.stream_rows(query), columns, fmt), media_type=MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
@@ -0,0 +1,82 @@
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import bcrypt
+from backend.app.config import settings
+
+_executor: Executor | None = None
+_stats = {
+    "submitted": 0,
+    "completed": 0,
+    "queue_wait_seconds_total": 0.0,
+    "queue_wait_seconds_max": 0.0,
+    "work_seconds_total": 0.0,
+}
+
+
+def hash_password(password: str, rounds: int | None = None) -> str:
+    salt = bcrypt.gensalt(rounds=rounds or settings.BCRYPT_ROUNDS)
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+
+def verify_password(password: str, hashed: str) -> bool:
+    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+
+def password_needs_rehash(hashed: str) -> bool:
+    try:
+        return int(hashed.split("$")[2]) != settings.BCRYPT_ROUNDS
+    except (IndexError, ValueError):
+        return True
+
+
+def _timed(submitted_at: float, func, *args):
+    started_at = time.monotonic()
+    return func(*args), started_at - submitted_at, time.monotonic() - started_at
+
+
+def _get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        workers = settings.BCRYPT_WORKERS or os.cpu_count() or 1
+        if settings.BCRYPT_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+    return _executor
+
+
+async def _run(func, *args):
+    # The pool size is the concurrency cap; anything beyond it waits in the executor queue.
+    _stats["submitted"] += 1
+    try:
+        result, waited, worked = await asyncio.get_running_loop().run_in_executor(
+            _get_executor(), _timed, time.monotonic(), func, *args
+        )
+    finally:
+        _stats["completed"] += 1
+    _stats["queue_wait_seconds_total"] += waited
+    _stats["queue_wait_seconds_max"] = max(_stats["queue_wait_seconds_max"], waited)
+    _stats["work_seconds_total"] += worked
+    return result
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run(hash_password, password, settings.BCRYPT_ROUNDS)
+
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    return await _run(verify_password, password, hashed)
+
+
+def hashing_stats() -> dict:
+    return {**_stats, "pending": _stats["submitted"] - _stats["completed"],
+            "workers": settings.BCRYPT_WORKERS or os.cpu_count() or 1, "executor": settings.BCRYPT_EXECUTOR}
+
+
+def shutdown_hashing() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
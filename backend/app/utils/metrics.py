@@ -0,0 +1,166 @@
+import time
+from bisect import bisect_left
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from backend.app.config import settings
+from backend.app.data.db import db_stats, new_db_stats, pool_status
+from backend.app.utils import sql_profile
+from backend.app.utils.admission import admission_status
+from backend.app.utils.hashing import hashing_stats
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name, self.documentation, self.labelnames = name, documentation, labelnames
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in self._values.items():
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+
+class Histogram:
+    """Bucket counts are stored per bucket and only made cumulative when rendered."""
+
+    def __init__(self, name: str, documentation: str, buckets: tuple, labelnames: tuple[str, ...] = ()):
+        self.name, self.documentation, self.labelnames = name, documentation, labelnames
+        self.buckets = buckets
+        self._series: dict[tuple, list] = {}
+
+    def observe(self, labels: tuple, value: float) -> None:
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), counts):
+                cumulative += count
+                le = f'le="{bound}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {total}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+REQUESTS = Counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "HTTP request latency by route.",
+                            LATENCY_BUCKETS, ("method", "route"))
+DB_QUERY_LATENCY = Histogram("db_query_duration_seconds", "Latency of single DB statements by route.",
+                             QUERY_BUCKETS, ("route",))
+DB_QUERIES_PER_REQUEST = Histogram("db_queries_per_request", "DB statements issued per request by route.",
+                                   QUERY_COUNT_BUCKETS, ("route",))
+COLLECTORS = (REQUESTS, REQUEST_LATENCY, DB_QUERY_LATENCY, DB_QUERIES_PER_REQUEST)
+in_flight = 0
+
+
+def _gauge(name: str, documentation: str, value, kind: str = "gauge"):
+    yield f"# HELP {name} {documentation}"
+    yield f"# TYPE {name} {kind}"
+    yield f"{name} {value}"
+
+
+def render_metrics() -> str:
+    lines = [*_gauge("http_requests_in_flight", "Requests currently being served.", in_flight)]
+    for collector in COLLECTORS:
+        lines.extend(collector.render())
+
+    pool = pool_status()
+    for key, documentation in (("size", "Configured pool size."), ("checked_out", "Connections in use."),
+                               ("idle", "Idle pooled connections."), ("overflow", "Connections above the pool size.")):
+        lines.extend(_gauge(f"db_pool_{key}", documentation, pool[key]))
+    lines.extend(_gauge("db_pool_checkouts_total", "Pool checkouts.", pool["checkouts"], "counter"))
+    lines.extend(_gauge("db_pool_timeouts_total", "Pool checkouts that timed out.", pool["timeouts"], "counter"))
+
+    admission = admission_status()
+    for key, kind, documentation in (("in_use", "gauge", "Requests admitted per route group."),
+                                     ("waiting", "gauge", "Requests queued for admission per route group."),
+                                     ("shed", "counter", "Requests rejected with 503 by admission control.")):
+        name = "admission_shed_total" if key == "shed" else f"admission_{key}"
+        lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {kind}"]
+        lines += [f'{name}{{group="{group}"}} {gate[key]}' for group, gate in admission.items()]
+
+    hashing = hashing_stats()
+    lines.extend(_gauge("bcrypt_jobs_pending", "bcrypt jobs queued or running.", hashing["pending"]))
+    lines += [
+        "# HELP bcrypt_queue_wait_seconds Time bcrypt jobs waited for a worker.",
+        "# TYPE bcrypt_queue_wait_seconds summary",
+        f"bcrypt_queue_wait_seconds_sum {hashing['queue_wait_seconds_total']}",
+        f"bcrypt_queue_wait_seconds_count {hashing['completed']}",
+    ]
+    lines.extend(_gauge("bcrypt_work_seconds_total", "Time spent hashing.", hashing["work_seconds_total"], "counter"))
+    return "\n".join(lines) + "\n"
+
+
+def _route_of(scope: Scope) -> str:
+    # The route template keeps label cardinality bounded (``/api/students/{student_id}``, not every id).
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """Installs the per-request DB counters, reports them as headers and records request metrics."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        global in_flight
+        stats = new_db_stats()
+        db_stats.set(stats)
+        status_code = 500
+
+        async def send_with_stats(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers["X-DB-Connections"] = str(stats["connections"])
+                headers["X-DB-Transactions"] = str(stats["transactions"])
+                headers["X-DB-Queries"] = str(len(stats["queries"]))
+            await send(message)
+
+        started = time.perf_counter()
+        in_flight += 1
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            in_flight -= 1
+            elapsed = time.perf_counter() - started
+            route, method = _route_of(scope), scope["method"]
+            if settings.SQL_PROFILE_ENABLED:
+                sql_profile.report(method, route, status_code, elapsed, stats)
+            if settings.METRICS_ENABLED:
+                REQUESTS.inc((method, route, status_code))
+                REQUEST_LATENCY.observe((method, route), elapsed)
+                DB_QUERIES_PER_REQUEST.observe((route,), len(stats["queries"]))
+                for duration in stats["queries"]:
+                    DB_QUERY_LATENCY.observe((route,), duration)
@@ -1,22 +1,16 @@
 from datetime import datetime, timedelta
 from typing import Annotated
-import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from backend.app.config import settings
+from backend.app.data.cache import TTLCache
 from backend.app.data.models import User
 from backend.app.data.db_requests.users import user_requests
+from backend.app.utils.hashing import hash_password, verify_password  # noqa: F401 - re-exported
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
-
-
-def hash_password(password: str) -> str:
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-
-
-def verify_password(password: str, hashed: str) -> bool:
-    return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+_token_cache = TTLCache(settings.AUTH_TOKEN_CACHE_SIZE, settings.AUTH_TOKEN_CACHE_TTL)
 
 
 def create_access_token(data: dict, expires_delta: timedelta | None = None) -> str:
@@ -26,6 +20,13 @@ def create_access_token(data: dict, expires_delta: timedelta | None = None) -> s
     return jwt.encode(to_encode, settings.JWT_SECRET, algorithm=settings.JWT_ALGORITHM)
 
 
+def create_user_token(user: User) -> str:
+    data = {"sub": str(user.id)}
+    if settings.AUTH_STATELESS_TOKENS:
+        data.update({"email": user.email, "created_at": user.created_at.isoformat()})
+    return create_access_token(data=data)
+
+
 def decode_access_token(token: str):
     try:
         return jwt.decode(token, settings.JWT_SECRET, algorithms=[settings.JWT_ALGORITHM])
@@ -33,20 +34,41 @@ def decode_access_token(token: str):
         return None
 
 
+def verify_access_token(token: str):
+    payload = _token_cache.get(token)
+    if payload is None:
+        payload = decode_access_token(token)
+        if payload and "exp" in payload:
+            _token_cache.set(token, payload, expires_at=payload["exp"])
+    return payload
+
+
+def _user_from_claims(payload: dict) -> User | None:
+    if "email" not in payload or "created_at" not in payload:
+        return None
+    try:
+        return User(id=int(payload["sub"]), email=payload["email"],
+                    created_at=datetime.fromisoformat(payload["created_at"]))
+    except (ValueError, TypeError):
+        return None
+
+
 async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    payload = decode_access_token(token)
+    payload = verify_access_token(token)
     if not payload:
         raise credentials_exception
     user_id = payload.get("sub")
     if not user_id:
         raise credentials_exception
+    if settings.AUTH_STATELESS_TOKENS and (user := _user_from_claims(payload)):
+        return user
     try:
-        user = await user_requests.get_by_id(int(user_id))
+        user = await user_requests.get_cached(int(user_id))
     except (ValueError, TypeError):
         raise credentials_exception
     if not user:
@@ -0,0 +1,38 @@
+import json
+from datetime import date, datetime, time
+from typing import Callable, Iterable, Sequence
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; without it the stdlib encoder is used
+    orjson = None
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response for content that is already plain data: no jsonable_encoder, no response_model pass."""
+
+    def render(self, content) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content)
+        return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_json_default).encode("utf-8")
+
+
+def serializer(columns: Iterable[str]) -> Callable[[Sequence], dict]:
+    """Build ``row -> dict`` over the leading ``columns`` of read-model rows."""
+    columns = tuple(columns)
+    return lambda row: dict(zip(columns, row))
+
+
+def json_page(content: dict, serialize: Callable[[Sequence], dict], response: Response) -> FastJSONResponse:
+    """Serialize a ``build_page``/``build_batch`` dict, keeping headers dependencies set on ``response``."""
+    content["items"] = [serialize(item) for item in content["items"]]
+    headers = {key: value for key, value in response.headers.items() if key != "content-length"}
+    return FastJSONResponse(content, headers=headers)
@@ -0,0 +1,58 @@
+import json
+import logging
+import re
+from backend.app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|\?")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:::\w+)?(?:\s*,\s*\?(?:::\w+)?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def statement_shape(statement: str) -> str:
+    """Normalise placeholders and IN-list lengths so queries differing only in values compare equal."""
+    shape = _PLACEHOLDER.sub("?", statement)
+    return _WHITESPACE.sub(" ", _PLACEHOLDER_LIST.sub("?, ...", shape)).strip()
+
+
+def analyze(statements: list[tuple[str, float, str]]) -> tuple[list[dict], list[dict]]:
+    """Group (statement, seconds, parameter fingerprint) records by shape; return (groups, N+1 suspects)."""
+    groups: dict[str, dict] = {}
+    for statement, seconds, fingerprint in statements:
+        group = groups.setdefault(statement_shape(statement), {"count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                                                               "fingerprints": set()})
+        group["count"] += 1
+        group["total_ms"] += seconds * 1000
+        group["max_ms"] = max(group["max_ms"], seconds * 1000)
+        group["fingerprints"].add(fingerprint)
+    summary = sorted(
+        ({"sql": shape, "count": g["count"], "distinct_params": len(g["fingerprints"]),
+          "total_ms": round(g["total_ms"], 3), "max_ms": round(g["max_ms"], 3)} for shape, g in groups.items()),
+        key=lambda g: g["total_ms"], reverse=True,
+    )
+    # The same shape run again and again with different parameters is the N+1 signature.
+    suspects = [g for g in summary if g["count"] >= settings.SQL_PROFILE_N_PLUS_ONE and g["distinct_params"] > 1]
+    return summary, suspects
+
+
+def report(method: str, route: str, status_code: int, seconds: float, stats: dict) -> None:
+    statements = stats.get("statements")
+    if statements is None:
+        return
+    summary, suspects = analyze(statements)
+    db_ms = sum(seconds for _, seconds, _ in statements) * 1000
+    reasons = []
+    if len(statements) > settings.SQL_PROFILE_MAX_QUERIES:
+        reasons.append("query_count")
+    if seconds * 1000 > settings.SQL_PROFILE_MAX_DURATION_MS:
+        reasons.append("duration")
+    if suspects:
+        reasons.append("n_plus_one")
+    if not reasons:
+        return
+    logger.warning(json.dumps({
+        "event": "sql_profile", "reasons": reasons, "method": method, "route": route, "status": status_code,
+        "duration_ms": round(seconds * 1000, 3), "db_ms": round(db_ms, 3), "query_count": len(statements),
+        "n_plus_one": suspects, "statements": summary,
+    }, ensure_ascii=False))
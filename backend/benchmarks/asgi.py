@@ -0,0 +1,78 @@
+"""Minimal in-process ASGI client, so benchmarks measure the app and the database, not a network stack."""
+
+import asyncio
+import json
+import uuid
+from typing import NamedTuple
+from urllib.parse import urlencode
+
+
+class Response(NamedTuple):
+    status: int
+    headers: dict[str, str]
+    body: bytes
+
+    def json(self):
+        return json.loads(self.body)
+
+
+def _multipart(files: dict[str, tuple[str, bytes, str]]) -> tuple[bytes, bytes]:
+    boundary = uuid.uuid4().hex
+    parts = []
+    for field, (filename, content, content_type) in files.items():
+        parts.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+            f"Content-Type: {content_type}\r\n\r\n".encode() + content + b"\r\n"
+        )
+    body = b"".join(parts) + f"--{boundary}--\r\n".encode()
+    return body, f"multipart/form-data; boundary={boundary}".encode()
+
+
+async def request(app, method: str, path: str, params: dict | None = None, json_body=None,
+                  form: dict | None = None, files: dict | None = None, headers: dict | None = None) -> Response:
+    raw_headers = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    body = b""
+    if files is not None:
+        body, content_type = _multipart(files)
+        raw_headers.append((b"content-type", content_type))
+    elif json_body is not None:
+        body = json.dumps(json_body, default=str).encode()
+        raw_headers.append((b"content-type", b"application/json"))
+    elif form is not None:
+        body = urlencode(form).encode()
+        raw_headers.append((b"content-type", b"application/x-www-form-urlencoded"))
+    raw_headers.append((b"content-length", str(len(body)).encode()))
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method,
+        "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": urlencode(params or {}, doseq=True).encode(), "headers": raw_headers,
+        "client": ("127.0.0.1", 0), "server": ("bench", 80), "root_path": "",
+    }
+    sent = False
+    finished = asyncio.Event()
+    status, response_headers, chunks = 500, {}, []
+
+    async def receive():
+        nonlocal sent
+        if sent:
+            # Disconnecting right after the body would cancel streaming responses mid-way.
+            await finished.wait()
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        nonlocal status, response_headers
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers = {k.decode().lower(): v.decode() for k, v in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                finished.set()
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        finished.set()
+    return Response(status, response_headers, b"".join(chunks))
@@ -0,0 +1,160 @@
+"""Concurrent load scenarios against ``backend.app.main:app`` with JSON results.
+
+The app is driven in-process over ASGI by ``--concurrency`` async clients. Each scenario
+runs ``--requests`` requests after ``--warmup`` unmeasured ones. Reported figures are
+throughput and p50/p95/p99 latency. Seed first, or pass ``--seed`` with the volumes:
+
+    python -m backend.benchmarks.load --seed --students 100000 --teachers 1000 --schedule 100000
+    python -m backend.benchmarks.load --scenarios list deep_page search --concurrency 64 > run.json
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import time
+import uuid
+
+from sqlalchemy import func, select
+
+from backend.app.data.db import engine
+from backend.app.data.models import Student
+from backend.app.main import app
+from backend.benchmarks import asgi
+from backend.benchmarks.seed import BENCH_USER, seed
+
+SEARCH_TERMS = ("Ivanov", "Petrova12", "student4242@", "Smirnvo", "Анна")
+
+
+class Scenarios:
+    """Each scenario is a coroutine making one request; ``students`` is the seeded row count."""
+
+    def __init__(self, token: str, students: int):
+        self.headers = {"authorization": f"Bearer {token}"}
+        self.students = max(students, 1)
+
+    async def list(self):
+        return await asgi.request(app, "GET", "/api/students", {"per_page": 20}, headers=self.headers)
+
+    async def deep_page(self):
+        last_page = max(self.students // 20, 1)
+        page = random.randint(max(last_page - 100, 1), last_page)
+        return await asgi.request(app, "GET", "/api/students", {"per_page": 20, "page": page, "sort": "last_name"},
+                                  headers=self.headers)
+
+    async def search(self):
+        return await asgi.request(app, "GET", "/api/students", {"per_page": 20, "search": random.choice(SEARCH_TERMS)},
+                                  headers=self.headers)
+
+    async def detail(self):
+        return await asgi.request(app, "GET", f"/api/students/{random.randint(1, self.students)}",
+                                  headers=self.headers)
+
+    async def schedule(self):
+        return await asgi.request(app, "GET", "/api/schedule", {"per_page": 20}, headers=self.headers)
+
+    async def create(self):
+        suffix = uuid.uuid4().hex[:12]
+        return await asgi.request(app, "POST", "/api/students", headers=self.headers, json_body={
+            "first_name": "Bench", "last_name": "Create", "email": f"create-{suffix}@bench.example.com",
+            "phone": "+79000000000", "birth_date": "2010-05-05",
+        })
+
+    async def login(self):
+        return await asgi.request(app, "POST", "/api/auth/login", form=BENCH_USER)
+
+
+SCENARIOS = ("list", "deep_page", "search", "detail", "schedule", "create", "login")
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(q / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+async def run_scenario(call, requests: int, concurrency: int, warmup: int) -> dict:
+    for _ in range(warmup):
+        await call()
+    timings, errors, statuses = [], 0, {}
+    remaining = iter(range(requests))
+
+    async def client():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            response = await call()
+            timings.append((time.perf_counter() - started) * 1000)
+            statuses[response.status] = statuses.get(response.status, 0) + 1
+            if response.status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    timings.sort()
+    return {
+        "requests": len(timings), "errors": errors, "statuses": {str(k): v for k, v in sorted(statuses.items())},
+        "seconds": round(elapsed, 3), "rps": round(len(timings) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(timings, 50), 3), "p95_ms": round(percentile(timings, 95), 3),
+        "p99_ms": round(percentile(timings, 99), 3), "max_ms": round(timings[-1], 3) if timings else 0.0,
+        "mean_ms": round(statistics.fmean(timings), 3) if timings else 0.0,
+    }
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> dict:
+    dataset = None
+    if args.seed:
+        dataset = await seed(args.students, args.teachers, args.instruments, args.schedule)
+    async with engine.connect() as conn:
+        students = await conn.scalar(select(func.max(Student.id))) or 0
+
+    login = await asgi.request(app, "POST", "/api/auth/login", form=BENCH_USER)
+    if login.status != 200:
+        raise SystemExit(f"Login as {BENCH_USER['username']} failed ({login.status}); run with --seed first")
+    scenarios = Scenarios(login.json()["access_token"], students)
+
+    results = {}
+    for name in args.scenarios:
+        results[name] = await run_scenario(getattr(scenarios, name), args.requests, args.concurrency, args.warmup)
+    return {
+        "revision": git_revision(), "dataset": dataset or {"students": students},
+        "concurrency": args.concurrency, "scenarios": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--seed", action="store_true", help="truncate and reseed before running")
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--teachers", type=int, default=300)
+    parser.add_argument("--instruments", type=int, default=1_000)
+    parser.add_argument("--schedule", type=int, default=10_000)
+    args = parser.parse_args()
+
+    async def wrapped():
+        try:
+            return await run(args)
+        finally:
+            await engine.dispose()
+
+    print(json.dumps(asyncio.run(wrapped()), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
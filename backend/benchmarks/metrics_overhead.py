@@ -0,0 +1,84 @@
+"""Per-request and per-query cost of the metrics collection, without a database.
+
+Drives a stub ASGI app directly and with ``MetricsMiddleware`` around it, calls the
+cursor-execute listeners the way the engine does, and times a /metrics render:
+
+    python -m backend.benchmarks.metrics_overhead --requests 50000 --queries 5
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+from backend.app.data import db
+from backend.app.utils import metrics
+
+ROUTE = SimpleNamespace(path="/api/students/{student_id}")
+
+
+def stub_app(queries: int):
+    async def app(scope, receive, send):
+        scope["route"] = ROUTE
+        stats = db.db_stats.get()
+        if stats is not None:
+            stats["queries"].extend([0.001] * queries)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"{}"})
+    return app
+
+
+async def drive(app, requests: int) -> float:
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        pass
+
+    started = time.perf_counter()
+    for _ in range(requests):
+        await app({"type": "http", "method": "GET", "path": "/api/students/1", "headers": []}, receive, send)
+    return (time.perf_counter() - started) / requests * 1e6
+
+
+def listener_cost(calls: int) -> float:
+    context = SimpleNamespace()
+    db.db_stats.set(db.new_db_stats())
+    started = time.perf_counter()
+    for _ in range(calls):
+        db._before_execute(None, None, "", None, context, False)
+        db._after_execute(None, None, "", None, context, False)
+    return (time.perf_counter() - started) / calls * 1e6
+
+
+def render_cost(repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        metrics.render_metrics()
+    return (time.perf_counter() - started) / repeat * 1e3
+
+
+async def run(requests: int, queries: int) -> dict:
+    app = stub_app(queries)
+    bare = await drive(app, requests)
+    wrapped = await drive(metrics.MetricsMiddleware(app), requests)
+    return {
+        "requests": requests, "queries_per_request": queries,
+        "bare_us_per_request": round(bare, 2), "with_metrics_us_per_request": round(wrapped, 2),
+        "middleware_overhead_us": round(wrapped - bare, 2),
+        "query_listeners_us_per_query": round(listener_cost(requests), 3),
+        "render_ms": round(render_cost(100), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.requests, args.queries)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Memory and latency of one list page read as ORM entities versus read-model rows.
+
+For each entity the same page is fetched two ways: the ORM path (``select(Model)``, with
+``selectinload`` of the participants for schedule, as list endpoints did before) and the
+read-model projection the ``db_requests`` classes use now. Latency is timed over
+``--repeat`` fetches; memory is the tracemalloc peak during one fetch and the size still
+held by the returned page. Seed first, or pass ``--seed``:
+
+    python -m backend.benchmarks.read_models --seed --per-page 100 --repeat 200
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import tracemalloc
+
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from backend.app.data.db import engine, get_session
+from backend.app.data.db_requests.instruments import instrument_requests
+from backend.app.data.db_requests.schedule import schedule_requests
+from backend.app.data.db_requests.students import student_requests
+from backend.app.data.db_requests.teachers import teacher_requests
+from backend.benchmarks.load import percentile
+from backend.benchmarks.seed import seed
+
+REQUESTS = {
+    "students": student_requests, "teachers": teacher_requests,
+    "instruments": instrument_requests, "schedule": schedule_requests,
+}
+MODELS = {"students": "Student", "teachers": "Teacher", "instruments": "Instrument", "schedule": "Schedule"}
+
+
+def orm_query(name: str, per_page: int):
+    requests = REQUESTS[name]
+    model = getattr(requests, MODELS[name])
+    query = select(model)
+    if name == "schedule":
+        query = query.options(selectinload(model.student), selectinload(model.teacher))
+    return query.order_by(model.id).limit(per_page)
+
+
+def read_query(name: str, per_page: int):
+    requests = REQUESTS[name]
+    model = getattr(requests, MODELS[name])
+    return requests._read_query(model).order_by(model.id).limit(per_page)
+
+
+async def fetch_orm(name: str, per_page: int) -> list:
+    async with get_session() as session:
+        return list((await session.scalars(orm_query(name, per_page))).all())
+
+
+async def fetch_rows(name: str, per_page: int) -> list:
+    async with get_session() as session:
+        return list((await session.execute(read_query(name, per_page))).all())
+
+
+async def latency(fetch, name: str, per_page: int, repeat: int) -> dict:
+    await fetch(name, per_page)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await fetch(name, per_page)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {"p50_ms": round(percentile(timings, 50), 3), "p95_ms": round(percentile(timings, 95), 3),
+            "mean_ms": round(statistics.fmean(timings), 3)}
+
+
+async def memory(fetch, name: str, per_page: int) -> dict:
+    await fetch(name, per_page)
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        page = await fetch(name, per_page)
+        held, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"rows": len(page), "peak_kib": round((peak - before) / 1024, 1),
+            "held_kib": round((held - before) / 1024, 1)}
+
+
+async def run(args) -> dict:
+    if args.seed:
+        await seed(args.students, args.teachers, args.instruments, args.schedule)
+    results = {}
+    for name in args.entities:
+        results[name] = {
+            variant: {**await latency(fetch, name, args.per_page, args.repeat),
+                      **await memory(fetch, name, args.per_page)}
+            for variant, fetch in (("orm", fetch_orm), ("read_model", fetch_rows))
+        }
+    return {"per_page": args.per_page, "repeat": args.repeat, "entities": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entities", nargs="+", choices=REQUESTS, default=list(REQUESTS))
+    parser.add_argument("--per-page", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--seed", action="store_true", help="truncate and reseed before running")
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--teachers", type=int, default=300)
+    parser.add_argument("--instruments", type=int, default=1_000)
+    parser.add_argument("--schedule", type=int, default=10_000)
+    args = parser.parse_args()
+
+    async def wrapped():
+        try:
+            return await run(args)
+        finally:
+            await engine.dispose()
+
+    print(json.dumps(asyncio.run(wrapped()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
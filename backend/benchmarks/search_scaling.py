@@ -0,0 +1,88 @@
+"""Search latency versus row count: legacy ILIKE scan against the trigram path.
+
+Rows are seeded inside a transaction that is rolled back at the end, so the
+script can be pointed at a development database:
+
+    python -m backend.benchmarks.search_scaling --rows 1000 10000 100000
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from sqlalchemy import or_, select, text
+
+from backend.app.data.db import engine
+from backend.app.data.db_requests.students import student_requests
+
+SEED_STUDENTS = text("""
+    INSERT INTO students (first_name, last_name, email, phone, birth_date, created_at)
+    SELECT (ARRAY['Anna','Ivan','Maria','Pavel','Olga','Sergey','Elena','Dmitry'])[1 + g % 8],
+           (ARRAY['Ivanov','Petrova','Smirnov','Kuznetsova','Popov','Volkova','Sokolov','Lebedeva'])[1 + (g / 8) % 8]
+               || (g % 997)::text,
+           'bench' || g || '@example.com',
+           '+7900' || lpad(g::text, 7, '0'),
+           DATE '2005-01-01' + (g % 3650),
+           now()
+    FROM generate_series(1, :rows) AS g
+""")
+
+TERMS = {"common": "Ivanov", "rare": "bench4242@", "typo": "Smirnvo"}
+
+
+def legacy_query(search: str):
+    model = student_requests.Student
+    return select(model).where(or_(
+        model.first_name.ilike(f"%{search}%"), model.last_name.ilike(f"%{search}%"),
+        model.email.ilike(f"%{search}%"), model.phone.ilike(f"%{search}%"),
+    )).order_by(model.id).limit(11)
+
+
+def trigram_query(search: str):
+    model = student_requests.Student
+    rank = student_requests._search_rank(search, model.search_text)
+    query = select(model).where(student_requests._search_match(search, model.search_text))
+    return student_requests._paginate(query, model, "relevance", 1, 10, None, rank=rank)
+
+
+async def measure(conn, query, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        rows = (await conn.execute(query)).all()
+        timings.append((time.perf_counter() - started) * 1000)
+    return {"p50_ms": round(statistics.median(timings), 3), "max_ms": round(max(timings), 3), "rows": len(rows)}
+
+
+async def run(row_counts: list[int], repeat: int) -> list[dict]:
+    results = []
+    for rows in row_counts:
+        async with engine.connect() as conn:
+            trans = await conn.begin()
+            try:
+                await conn.execute(SEED_STUDENTS, {"rows": rows})
+                await conn.execute(text("ANALYZE students"))
+                for label, term in TERMS.items():
+                    results.append({
+                        "rows": rows, "term": label,
+                        "legacy": await measure(conn, legacy_query(term), repeat),
+                        "trigram": await measure(conn, trigram_query(term), repeat),
+                    })
+            finally:
+                await trans.rollback()
+    await engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args.rows, args.repeat)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
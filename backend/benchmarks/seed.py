@@ -0,0 +1,101 @@
+"""Bulk synthetic data for benchmarks.
+
+Everything is generated server-side with INSERT ... SELECT over generate_series, so a
+million rows take seconds. Lessons are laid out so the overlap constraints always hold:
+every teacher teaches in their own room in consecutive 15-minute slots, and the students
+sharing a slot are distinct.
+
+    python -m backend.benchmarks.seed --students 100000 --teachers 1000 --instruments 10000 --schedule 100000
+"""
+
+import argparse
+import asyncio
+import json
+
+from sqlalchemy import text
+
+from backend.app.data.db import engine
+from backend.app.data.db_requests.users import user_requests
+from backend.app.main import init_db
+from backend.app.utils.hashing import hash_password
+
+BENCH_USER = {"username": "bench@example.com", "password": "bench-password"}
+# Seven days of 48 slots (08:00-20:00 in 15 minutes) per teacher.
+SLOTS_PER_TEACHER = 7 * 48
+
+FIRST_NAMES = "ARRAY['Anna','Ivan','Maria','Pavel','Olga','Sergey','Elena','Dmitry']"
+LAST_NAMES = "ARRAY['Ivanov','Petrova','Smirnov','Kuznetsova','Popov','Volkova','Sokolov','Lebedeva']"
+
+SEED_STUDENTS = text(f"""
+    INSERT INTO students (first_name, last_name, email, phone, birth_date, created_at)
+    SELECT ({FIRST_NAMES})[1 + g % 8], ({LAST_NAMES})[1 + (g / 8) % 8] || (g % 997)::text,
+           'student' || g || '@bench.example.com', '+7900' || lpad(g::text, 7, '0'),
+           DATE '2005-01-01' + (g % 3650), now() - (g || ' seconds')::interval
+    FROM generate_series(1, :rows) AS g
+""")
+SEED_TEACHERS = text(f"""
+    INSERT INTO teachers (first_name, last_name, email, phone, specialization, created_at)
+    SELECT ({FIRST_NAMES})[1 + (g / 3) % 8], ({LAST_NAMES})[1 + g % 8] || (g % 89)::text,
+           'teacher' || g || '@bench.example.com', '+7910' || lpad(g::text, 7, '0'),
+           (ARRAY['Фортепиано','Скрипка','Гитара','Вокал','Флейта','Ударные'])[1 + g % 6], now()
+    FROM generate_series(1, :rows) AS g
+""")
+SEED_INSTRUMENTS = text("""
+    INSERT INTO instruments (name, type, brand, condition, created_at)
+    SELECT 'Instrument ' || g, (ARRAY['Струнные','Клавишные','Духовые','Ударные'])[1 + g % 4],
+           (ARRAY['Yamaha','Steinway','Fender','Gibson','Casio','Roland'])[1 + g % 6],
+           (ARRAY['Отличное','Хорошее','Удовлетворительное'])[1 + g % 3], now()
+    FROM generate_series(1, :rows) AS g
+""")
+# Tables are truncated with RESTART IDENTITY first, so ids run from 1 without gaps.
+SEED_SCHEDULE = text("""
+    INSERT INTO schedule (student_id, teacher_id, day_of_week, start_time, end_time, room, created_at)
+    SELECT 1 + g % :students, 1 + g % :teachers, 1 + (g / :teachers) % 7,
+           TIME '08:00' + ((g / :teachers / 7) % 48) * INTERVAL '15 minutes',
+           TIME '08:15' + ((g / :teachers / 7) % 48) * INTERVAL '15 minutes',
+           'Room ' || (1 + g % :teachers), now()
+    FROM generate_series(0, :rows - 1) AS g
+""")
+
+
+async def seed(students: int, teachers: int, instruments: int, schedule: int) -> dict:
+    # Students sharing a slot are g % teachers apart, so they are distinct while teachers <= students.
+    schedule = min(schedule, teachers * SLOTS_PER_TEACHER) if teachers <= students else 0
+    await init_db()
+    async with engine.begin() as conn:
+        await conn.execute(text("TRUNCATE schedule, students, teachers, instruments RESTART IDENTITY CASCADE"))
+        await conn.execute(SEED_STUDENTS, {"rows": students})
+        await conn.execute(SEED_TEACHERS, {"rows": teachers})
+        await conn.execute(SEED_INSTRUMENTS, {"rows": instruments})
+        if schedule:
+            await conn.execute(SEED_SCHEDULE, {"rows": schedule, "teachers": teachers, "students": students})
+        await conn.execute(text("DELETE FROM users WHERE email = :email"), {"email": BENCH_USER["username"]})
+        await conn.execute(
+            text("INSERT INTO users (email, hashed_password, created_at) VALUES (:email, :hashed, now())"),
+            {"email": BENCH_USER["username"], "hashed": hash_password(BENCH_USER["password"])},
+        )
+        for table in ("students", "teachers", "instruments", "schedule", "users"):
+            await conn.execute(text(f"ANALYZE {table}"))
+    user_requests._cache.clear()
+    return {"students": students, "teachers": teachers, "instruments": instruments, "schedule": schedule}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--students", type=int, default=10_000)
+    parser.add_argument("--teachers", type=int, default=300)
+    parser.add_argument("--instruments", type=int, default=1_000)
+    parser.add_argument("--schedule", type=int, default=10_000)
+    args = parser.parse_args()
+
+    async def run():
+        try:
+            return await seed(args.students, args.teachers, args.instruments, args.schedule)
+        finally:
+            await engine.dispose()
+
+    print(json.dumps(asyncio.run(run()), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Per-item cost of serializing list pages, before and after the fast response path.
+
+"before" is what FastAPI does with ``response_model=PaginatedResponse[...]``: validate the
+page dict with ``from_attributes`` and dump it to JSON through the model (schedule items
+first go through a per-item dict). "after" is ``json_page`` over read-model row tuples: one
+``zip`` per item and ``FastJSONResponse.render``. Entities are transient ORM instances and rows
+are tuples of the same values, so no database is needed:
+
+    python -m backend.benchmarks.serialization --items 100 --repeat 2000
+"""
+
+import argparse
+import json
+import time
+from datetime import date, datetime, time as time_of_day
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from backend.app.data.models import WEEKDAYS, Instrument, Schedule, Student, Teacher
+from backend.app.data.pagination import Page, build_page
+from backend.app.data.db_requests.instruments import instrument_requests
+from backend.app.data.db_requests.schedule import schedule_requests
+from backend.app.data.db_requests.students import student_requests
+from backend.app.data.db_requests.teachers import teacher_requests
+from backend.app.routers import instruments, schedule, students, teachers
+from backend.app.schemas.common import PaginatedResponse
+from backend.app.schemas.instrument import InstrumentResponse
+from backend.app.schemas.schedule import ScheduleResponse
+from backend.app.schemas.student import StudentResponse
+from backend.app.schemas.teacher import TeacherResponse
+from backend.app.utils import serialization
+
+CREATED = datetime(2024, 9, 1, 12, 30)
+
+
+def make_student(i: int) -> Student:
+    return Student(id=i, first_name="Anna", last_name=f"Ivanova{i}", email=f"student{i}@example.com",
+                   phone="+79001234567", birth_date=date(2012, 3, 4), created_at=CREATED,
+                   full_name=f"Anna Ivanova{i}")
+
+
+def make_teacher(i: int) -> Teacher:
+    return Teacher(id=i, first_name="Ivan", last_name=f"Petrov{i}", email=f"teacher{i}@example.com",
+                   phone="+79007654321", specialization="Фортепиано", created_at=CREATED,
+                   full_name=f"Ivan Petrov{i}")
+
+
+def make_instrument(i: int) -> Instrument:
+    return Instrument(id=i, name=f"Instrument {i}", type="Струнные", brand="Yamaha", condition="Хорошее",
+                      created_at=CREATED)
+
+
+def make_lesson(i: int) -> Schedule:
+    return Schedule(id=i, student_id=i, teacher_id=i, student=make_student(i), teacher=make_teacher(i),
+                    day_of_week=WEEKDAYS[i % 7], start_time=time_of_day(10, 0), end_time=time_of_day(10, 45),
+                    room=f"Room {i % 12}", created_at=CREATED)
+
+
+def lesson_dict(s: Schedule) -> dict:
+    # What the schedule router built per item before rows carried the names.
+    return {
+        "id": s.id, "student_id": s.student_id, "teacher_id": s.teacher_id,
+        "student_name": f"{s.student.first_name} {s.student.last_name}",
+        "teacher_name": f"{s.teacher.first_name} {s.teacher.last_name}",
+        "day_of_week": s.day_of_week, "start_time": s.start_time, "end_time": s.end_time,
+        "room": s.room, "created_at": s.created_at,
+    }
+
+
+def lesson_row(s: Schedule) -> tuple:
+    return (*(getattr(s, c) for c in schedule_requests.READ_COLUMNS), s.student.full_name, s.teacher.full_name)
+
+
+def _row(columns):
+    return lambda entity: tuple(getattr(entity, c) for c in columns)
+
+
+ENTITIES = {
+    "students": (make_student, _row(student_requests.READ_COLUMNS), StudentResponse, students._serialize, None),
+    "teachers": (make_teacher, _row(teacher_requests.READ_COLUMNS), TeacherResponse, teachers._serialize, None),
+    "instruments": (make_instrument, _row(instrument_requests.READ_COLUMNS), InstrumentResponse,
+                    instruments._serialize, None),
+    "schedule": (make_lesson, lesson_row, ScheduleResponse, schedule._serialize, lesson_dict),
+}
+
+
+def _per_item_us(call, repeat: int, items: int) -> float:
+    call()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        call()
+    return (time.perf_counter() - started) / repeat / items * 1e6
+
+
+def measure(name: str, items: int, repeat: int) -> dict:
+    make, to_row, schema, serialize, build_response = ENTITIES[name]
+    page = Page([make(i) for i in range(1, items + 1)], 10_000, True, None)
+    rows = Page([to_row(entity) for entity in page.items], 10_000, True, None)
+    adapter = TypeAdapter(PaginatedResponse[schema])
+
+    def before():
+        content = build_page(page, 1, items, None)
+        if build_response is not None:
+            content["items"] = [build_response(item) for item in content["items"]]
+        return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+    def after():
+        return serialization.json_page(build_page(rows, 1, items, None), serialize, Response()).body
+
+    assert json.loads(before())["items"][0] == json.loads(after())["items"][0]
+    before_us, after_us = _per_item_us(before, repeat, items), _per_item_us(after, repeat, items)
+    return {"before_us_per_item": round(before_us, 3), "after_us_per_item": round(after_us, 3),
+            "speedup": round(before_us / after_us, 2), "page_bytes": len(after())}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=100, help="items per page")
+    parser.add_argument("--repeat", type=int, default=2000)
+    parser.add_argument("--entities", nargs="+", choices=ENTITIES, default=list(ENTITIES))
+    args = parser.parse_args()
+    results = {name: measure(name, args.items, args.repeat) for name in args.entities}
+    print(json.dumps({"items": args.items, "orjson": serialization.orjson is not None, "entities": results},
+                     indent=2))
+
+
+if __name__ == "__main__":
+    main()
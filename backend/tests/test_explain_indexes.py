@@ -0,0 +1,59 @@
+"""EXPLAIN checks that the hot schedule lookups use the composite indexes of the migrated schema.
+
+Each check compiles the statement the app actually runs (timetables, the overlap lookup
+behind 409 responses) or the one Postgres runs for an ON DELETE CASCADE and fails unless the
+plan uses one of the expected indexes and does not read ``schedule`` with a sequential scan.
+Plans depend on table statistics, so the module seeds realistic volumes first.
+"""
+
+import json
+from datetime import time
+
+import pytest
+from sqlalchemy import text
+
+from backend.app.data.db_requests.schedule import schedule_requests
+from backend.benchmarks.seed import seed
+
+OVERLAP_INDEXES = {
+    "ix_schedule_teacher_day_start", "ix_schedule_student_day_start", "ix_schedule_room_day_start",
+    "ex_schedule_teacher_overlap", "ex_schedule_student_overlap", "ex_schedule_room_overlap",
+}
+
+CHECKS = {
+    "teacher_timetable": (schedule_requests.timetable_query("teacher", 1), {"ix_schedule_teacher_day_start"}),
+    "student_timetable": (schedule_requests.timetable_query("student", 1), {"ix_schedule_student_day_start"}),
+    "room_timetable": (schedule_requests.timetable_query("room", "Room 1"), {"ix_schedule_room_day_start"}),
+    "overlap_lookup": (
+        schedule_requests.conflicts_query(1, 1, "Среда", time(10), time(10, 45), "Room 1", exclude_id=1),
+        OVERLAP_INDEXES,
+    ),
+    # The statements the FK triggers issue when a student or teacher is deleted.
+    "student_cascade": (text("DELETE FROM ONLY schedule WHERE student_id = 1"), {"ix_schedule_student_day_start"}),
+    "teacher_cascade": (text("DELETE FROM ONLY schedule WHERE teacher_id = 1"), {"ix_schedule_teacher_day_start"}),
+}
+
+
+def plan_nodes(plan: dict):
+    yield plan
+    for child in plan.get("Plans", ()):
+        yield from plan_nodes(child)
+
+
+@pytest.fixture(scope="module")
+async def conn(engine):
+    await seed(10_000, 300, 1_000, 10_000)
+    async with engine.connect() as conn:
+        yield conn
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("name", CHECKS)
+async def test_uses_index(name: str, conn):
+    statement, expected = CHECKS[name]
+    sql = statement.compile(dialect=conn.dialect, compile_kwargs={"literal_binds": True})
+    plan = (await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}")).scalar()
+    nodes = list(plan_nodes((json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]))
+    indexes = {node["Index Name"] for node in nodes if "Index Name" in node}
+    assert expected & indexes, f"expected any of {sorted(expected)}, plan uses {sorted(indexes)}"
+    assert not [node for node in nodes if node["Node Type"] == "Seq Scan" and node.get("Relation Name") == "schedule"]
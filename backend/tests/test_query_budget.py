@@ -0,0 +1,193 @@
+"""Per-endpoint SQL statement and transaction budgets, checked in-process.
+
+Every route has a case below. Each case calls its route once through the ASGI app and counts
+statements (``before_cursor_execute``) and transactions (``begin``) on the engine, including
+the batching loader's and streaming exports' own connections. Cases run in order on one seeded
+dataset, and the rows they delete are ones no earlier case removed by cascade.
+
+Auth caches are warmed first, so the figures are steady-state. Savepoints count as
+statements; COPY in imports does not go through the cursor and is not counted.
+"""
+
+import uuid
+from typing import NamedTuple
+
+import pytest
+from sqlalchemy import event
+
+from backend.app.main import app
+from backend.benchmarks import asgi
+from backend.benchmarks.seed import BENCH_USER, seed
+
+STUDENTS, TEACHERS, INSTRUMENTS, LESSONS = 200, 20, 50, 200
+LIST_SIZES = (1, 100)
+# Lessons 198-200 and 18-20, 38-40, ... belong to the students and teachers the entity
+# cases delete first, so the schedule cases delete these instead.
+DELETED_LESSONS = (150, 151, 152)
+
+
+class Case(NamedTuple):
+    method: str
+    route: str
+    status: int
+    statements: int
+    transactions: int
+    path: str | None = None
+    params: dict | None = None
+    json_body: object = None
+    form: dict | None = None
+    files: dict | None = None
+    auth: bool = True
+
+
+def _csv(header: str, row: str) -> dict:
+    return {"file": ("budget.csv", f"{header}\n{row}\n".encode(), "text/csv")}
+
+
+def _lesson(**overrides) -> dict:
+    lesson = {"student_id": 1, "teacher_id": 1, "day_of_week": "Воскресенье",
+              "start_time": "21:00", "end_time": "21:30", "room": "Budget room"}
+    return {**lesson, **overrides}
+
+
+def _entity_cases(prefix: str, item: str, last_id: int, create: dict, update: dict, csv: dict) -> list[Case]:
+    # List: version stamp + page. Detail: version stamp + one loader batch, both in the request session.
+    # Writes: one statement; updates add the SAVEPOINT/RELEASE pair around the UPDATE.
+    return [
+        *(Case("GET", prefix, 200, 2, 1, params={"per_page": size}) for size in LIST_SIZES),
+        Case("GET", prefix, 200, 2, 1, params={"ids": "1,2,3"}),
+        Case("GET", f"{prefix}/export", 200, 1, 1),
+        Case("GET", f"{prefix}/{{{item}}}", 200, 2, 1, path=f"{prefix}/1"),
+        Case("POST", prefix, 201, 1, 1, json_body=create),
+        Case("POST", f"{prefix}/import", 200, 2, 1, files=csv),
+        Case("PUT", f"{prefix}/{{{item}}}", 200, 3, 1, path=f"{prefix}/2", json_body=update),
+        Case("POST", f"{prefix}/bulk-delete", 200, 1, 1, json_body={"ids": [last_id - 1, last_id - 2]}),
+        Case("DELETE", f"{prefix}/{{{item}}}", 204, 1, 1, path=f"{prefix}/{last_id}"),
+    ]
+
+
+CASES = [
+    Case("POST", "/api/auth/login", 200, 1, 1, form=BENCH_USER, auth=False),
+    Case("POST", "/api/auth/register", 201, 1, 1,
+         json_body={"email": f"budget-{uuid.uuid4().hex[:8]}@bench.example.com", "password": "budget-pw"},
+         auth=False),
+    Case("GET", "/api/auth/me", 200, 0, 0),
+    *_entity_cases(
+        "/api/students", "student_id", STUDENTS,
+        {"first_name": "Budget", "last_name": "Student", "email": "budget-student@bench.example.com",
+         "phone": "+79001112233", "birth_date": "2010-01-01"},
+        {"phone": "+79001112244"},
+        _csv("first_name,last_name,email,phone,birth_date",
+             "Import,Student,import@bench.example.com,+79001112255,2011-02-02"),
+    ),
+    *_entity_cases(
+        "/api/teachers", "teacher_id", TEACHERS,
+        {"first_name": "Budget", "last_name": "Teacher", "email": "budget-teacher@bench.example.com",
+         "phone": "+79001112266", "specialization": "Гитара"},
+        {"specialization": "Вокал"},
+        _csv("first_name,last_name,email,phone,specialization",
+             "Import,Teacher,import@bench.example.com,+79001112277,Флейта"),
+    ),
+    *_entity_cases(
+        "/api/instruments", "instrument_id", INSTRUMENTS,
+        {"name": "Budget", "type": "Струнные", "brand": "Yamaha", "condition": "Хорошее"},
+        {"condition": "Отличное"},
+        _csv("name,type,brand,condition", "Import,Духовые,Roland,Хорошее"),
+    ),
+    # Schedule reads join the participants' names into the same statement.
+    *(Case("GET", "/api/schedule", 200, 2, 1, params={"per_page": size}) for size in LIST_SIZES),
+    Case("GET", "/api/schedule", 200, 2, 1, params={"ids": "1,2,3"}),
+    Case("GET", "/api/schedule/export", 200, 1, 1),
+    # The schedule version stamp, then the occupancy rebuild it calls for on a fresh process.
+    Case("GET", "/api/schedule/availability", 200, 2, 1, params={"duration": 45, "teacher_id": 1}),
+    Case("GET", "/api/schedule/{schedule_id}", 200, 2, 1, path="/api/schedule/1"),
+    # Timetables are one query on a cache miss and none afterwards; the budget is the miss.
+    Case("GET", "/api/teachers/{teacher_id}/timetable", 200, 1, 1, path="/api/teachers/1/timetable"),
+    Case("GET", "/api/students/{student_id}/timetable", 200, 1, 1, path="/api/students/1/timetable"),
+    Case("GET", "/api/schedule/rooms/{room}/timetable", 200, 1, 1, path="/api/schedule/rooms/Room 1/timetable"),
+    # Participant checks are two lookups in the request transaction; the write is SAVEPOINT,
+    # INSERT/UPDATE ... RETURNING, RELEASE.
+    Case("POST", "/api/schedule", 201, 5, 1, json_body=_lesson()),
+    Case("PUT", "/api/schedule/{schedule_id}", 200, 5, 1, path="/api/schedule/1",
+         json_body=_lesson(start_time="21:30", end_time="22:00")),
+    Case("POST", "/api/schedule/bulk-delete", 200, 1, 1, json_body={"ids": list(DELETED_LESSONS[:2])}),
+    Case("DELETE", "/api/schedule/{schedule_id}", 204, 1, 1, path=f"/api/schedule/{DELETED_LESSONS[2]}"),
+]
+
+
+def case_id(case: Case) -> str:
+    return f"{case.method} {case.path or case.route} {case.params or ''}".strip()
+
+
+class StatementCounter:
+    def __init__(self, engine):
+        self.engine = engine.sync_engine
+        self.statements = self.transactions = 0
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._on_statement)
+        event.listen(self.engine, "begin", self._on_begin)
+        return self
+
+    def __exit__(self, *exc):
+        event.remove(self.engine, "before_cursor_execute", self._on_statement)
+        event.remove(self.engine, "begin", self._on_begin)
+
+    def _on_statement(self, *args):
+        self.statements += 1
+
+    def _on_begin(self, conn):
+        self.transactions += 1
+
+
+async def call(case: Case, token: str) -> asgi.Response:
+    return await asgi.request(
+        app, case.method, case.path or case.route, case.params, json_body=case.json_body, form=case.form,
+        files=case.files, headers={"authorization": f"Bearer {token}"} if case.auth else None,
+    )
+
+
+@pytest.fixture(scope="module")
+async def token(engine):
+    await seed(STUDENTS, TEACHERS, INSTRUMENTS, LESSONS)
+    login = await asgi.request(app, "POST", "/api/auth/login", form=BENCH_USER)
+    token = login.json()["access_token"]
+    await asgi.request(app, "GET", "/api/auth/me", headers={"authorization": f"Bearer {token}"})
+    return token
+
+
+def test_every_route_has_a_budget():
+    # The OpenAPI paths list every operation, including those of included routers, which
+    # ``app.routes`` only shows as a wrapper on current FastAPI.
+    covered = {(case.method, case.route) for case in CASES}
+    uncovered = sorted(
+        f"{method.upper()} {path}"
+        for path, operations in app.openapi()["paths"].items() if path.startswith("/api/")
+        for method in operations if (method.upper(), path) not in covered
+    )
+    assert uncovered == []
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("case", CASES, ids=case_id)
+async def test_query_budget(case: Case, engine, token):
+    with StatementCounter(engine) as counter:
+        response = await call(case, token)
+    assert response.status == case.status, response.body
+    assert counter.statements <= case.statements
+    assert counter.transactions <= case.transactions
+    if case.route.endswith("/export"):
+        # A stream the client stopped reading early would show up as no statements at all.
+        assert counter.statements > 0
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("prefix", ["/api/students", "/api/teachers", "/api/instruments", "/api/schedule"])
+async def test_list_statements_do_not_depend_on_page_size(prefix: str, engine, token):
+    counts = []
+    for size in LIST_SIZES:
+        with StatementCounter(engine) as counter:
+            response = await call(Case("GET", prefix, 200, 0, 0, params={"per_page": size}), token)
+        assert response.status == 200, response.body
+        counts.append(counter.statements)
+    assert len(set(counts)) == 1, counts